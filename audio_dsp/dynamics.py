@@ -0,0 +1,243 @@
+"""
+Dynamics building blocks shared by the compressors.
+
+A compressor is a chain of small stages, each usable on its own:
+    LevelDetector     peak, RMS or true-peak level of the detector signal
+    gain_computer     static curve: gain change in dB for a level in dB
+    EnvelopeFollower  attack/release one-pole (kernels.attack_release)
+    apply_gain        gain in dB plus makeup, applied to the signal
+
+LevelDetector and EnvelopeFollower keep their state between process()
+calls. Streaming a signal block by block therefore gives the same result
+as one call on the whole array. Compressor wires the stages together:
+
+    from audio_dsp.dynamics import Compressor
+    comp = Compressor(44100, threshold=-18, ratio=4, attack=0.005, release=0.1)
+    out = np.concatenate([comp.process(block) for block in blocks])
+"""
+
+from functools import lru_cache
+import numpy as np
+from scipy.ndimage import uniform_filter1d
+from scipy.signal import firwin, lfilter
+from audio_dsp.kernels import attack_release
+
+__all__ = [
+    "db_to_linear",
+    "linear_to_db",
+    "time_to_coeff",
+    "rms_envelope",
+    "gain_computer",
+    "auto_makeup",
+    "apply_gain",
+    "LevelDetector",
+    "EnvelopeFollower",
+    "Compressor",
+]
+
+
+def db_to_linear(db):
+    """Convert dB to linear gain."""
+    return np.power(10.0, np.asarray(db, dtype=np.float64) / 20)
+
+
+def linear_to_db(linear, floor=1e-10):
+    """Convert linear amplitude to dB, flooring at `floor` to avoid log(0)."""
+    return 20 * np.log10(np.maximum(linear, floor))
+
+
+def time_to_coeff(seconds, sample_rate):
+    """One-pole coefficient exp(-1 / (seconds * sample_rate)); 0 for instant."""
+    samples = seconds * sample_rate
+    return float(np.exp(-1.0 / samples)) if samples > 0 else 0.0
+
+
+def rms_envelope(signal, window, centered=False):
+    """
+    Moving RMS over `window` samples.
+
+    Causal by default (each sample sees the window ending at itself).
+    centered=True matches np.convolve(x**2, ones(window)/window, 'same').
+    """
+    squares = np.square(np.asarray(signal, dtype=np.float64))
+    window = max(int(window), 1)
+    if centered:
+        mean = uniform_filter1d(squares, window, mode='constant')
+    else:
+        padded = np.concatenate((np.zeros(window - 1), squares))
+        mean = uniform_filter1d(padded, window, mode='constant')[window // 2:window // 2 + len(squares)]
+    return np.sqrt(np.maximum(mean, 0))
+
+
+def gain_computer(level_db, threshold, ratio, knee_width=0.0):
+    """
+    Static compression curve.
+
+    Returns the gain change in dB (<= 0) for each level in dB. Levels more
+    than knee_width/2 below the threshold are untouched. Levels above the
+    knee follow threshold + (level - threshold) / ratio. Inside the knee a
+    quadratic joins the two. ratio=np.inf gives a limiter.
+    """
+    level_db = np.asarray(level_db, dtype=np.float64)
+    slope = 1.0 / ratio - 1.0
+    gain_db = np.zeros_like(level_db)
+    half_knee = max(knee_width, 0.0) / 2
+    active = level_db > threshold - half_knee
+    over = level_db[active] - threshold
+    if half_knee > 0:
+        gain_db[active] = np.where(over > half_knee, slope * over,
+                                   slope * (over + half_knee) ** 2 / (4 * half_knee))
+    else:
+        gain_db[active] = slope * over
+    return gain_db
+
+
+def auto_makeup(threshold, ratio, knee_width=0.0):
+    """Makeup gain in dB that brings a 0 dBFS level back to 0 dBFS."""
+    return -float(gain_computer(0.0, threshold, ratio, knee_width))
+
+
+def apply_gain(signal, gain_db, makeup_db=0.0):
+    """Scale signal by gain_db + makeup_db (scalars or per-sample arrays)."""
+    return np.asarray(signal, dtype=np.float64) * db_to_linear(np.add(gain_db, makeup_db))
+
+
+@lru_cache(maxsize=8)
+def _true_peak_filter(oversample, zero_crossings):
+    """Polyphase interpolation filter: row p estimates the signal p/oversample samples later."""
+    taps = firwin(2 * zero_crossings * oversample + 1, 1.0 / oversample, window=('kaiser', 5.0))
+    padded = np.zeros(-(-len(taps) // oversample) * oversample)
+    padded[:len(taps)] = taps * oversample
+    polyphase = padded.reshape(-1, oversample).T.copy()
+    polyphase.setflags(write=False)
+    return polyphase
+
+
+class LevelDetector:
+    """
+    Level of a detector signal, streamable in blocks.
+
+    Modes:
+    - 'peak': |x|
+    - 'rms': causal moving RMS over `window` samples
+    - 'true_peak': largest |x| among `oversample` interpolated points per
+      sample (ITU-R BS.1770-style inter-sample peaks). This output lags
+      the input by `latency` samples.
+    """
+
+    def __init__(self, mode="peak", window=1, oversample=4, zero_crossings=8):
+        if mode not in ("peak", "rms", "true_peak"):
+            raise ValueError("mode must be 'peak', 'rms' or 'true_peak'")
+        self.mode = mode
+        self.window = max(int(window), 1)
+        self.latency = 0
+        if mode == "true_peak":
+            self._polyphase = _true_peak_filter(int(oversample), int(zero_crossings))
+            self.latency = int(zero_crossings)
+        self.reset()
+
+    def reset(self):
+        """Clear the streaming state."""
+        self._squares = np.zeros(self.window - 1)
+        if self.mode == "true_peak":
+            phases, length = self._polyphase.shape
+            self._zi = np.zeros((phases, length - 1))
+
+    def process(self, block):
+        """Return the level of the next block (same length as block)."""
+        x = np.asarray(block, dtype=np.float64)
+        if self.mode == "peak":
+            return np.abs(x)
+        if self.mode == "rms":
+            squares = np.concatenate((self._squares, x * x))
+            if self.window > 1:
+                self._squares = squares[-(self.window - 1):]
+            n, w = len(x), self.window
+            mean = uniform_filter1d(squares, w, mode='constant')[w // 2:w // 2 + n]
+            return np.sqrt(np.maximum(mean, 0))
+        level = np.zeros(len(x))
+        for p, taps in enumerate(self._polyphase):
+            y, self._zi[p] = lfilter(taps, [1.0], x, zi=self._zi[p])
+            np.maximum(level, np.abs(y), out=level)
+        return level
+
+
+class EnvelopeFollower:
+    """
+    Attack/release smoother, streamable in blocks.
+
+    attack and release are time constants in seconds. With
+    attack_on_rise=True the follower attacks when its input rises (level
+    envelopes); with False it attacks when the input falls (gain curves).
+    initial=None starts from the first input sample.
+    """
+
+    def __init__(self, sample_rate, attack=0.01, release=0.1, attack_on_rise=True, initial=0.0):
+        self.sample_rate = sample_rate
+        self.attack_coeff = time_to_coeff(attack, sample_rate)
+        self.release_coeff = time_to_coeff(release, sample_rate)
+        self.attack_on_rise = attack_on_rise
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        """Return to the initial state."""
+        self.state = self.initial
+
+    def process(self, block, release_coeff=None):
+        """
+        Smooth the next block. release_coeff optionally overrides the
+        release pole per sample (for program-dependent release).
+        """
+        release = self.release_coeff if release_coeff is None else release_coeff
+        out = attack_release(block, self.attack_coeff, release, initial=self.state,
+                             attack_on_rise=self.attack_on_rise)
+        if len(out):
+            self.state = out[-1]
+        return out
+
+
+class Compressor:
+    """
+    Feed-forward compressor built from the stages above.
+
+    The detector runs on the key signal (the input itself unless a
+    sidechain key is passed), the static curve gives a gain change in dB,
+    and the follower smooths it with attack when gain reduction increases.
+    State carries across process() calls.
+    """
+
+    def __init__(self, sample_rate, threshold=-20.0, ratio=4.0, attack=0.01, release=0.1,
+                 knee_width=0.0, makeup=0.0, detector="peak", rms_window=0.01):
+        """
+        Parameters:
+        - threshold: dB
+        - ratio: Compression ratio (np.inf for limiting)
+        - attack, release: Seconds
+        - knee_width: Soft-knee width in dB (0 = hard knee)
+        - makeup: Makeup gain in dB, or 'auto' for auto_makeup()
+        - detector: 'peak', 'rms' or 'true_peak'
+        - rms_window: RMS window in seconds
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.ratio = ratio
+        self.knee_width = knee_width
+        self.makeup = auto_makeup(threshold, ratio, knee_width) if makeup == "auto" else makeup
+        self.detector = LevelDetector(detector, window=int(rms_window * sample_rate))
+        self.follower = EnvelopeFollower(sample_rate, attack, release, attack_on_rise=False)
+
+    def reset(self):
+        """Clear detector and follower state."""
+        self.detector.reset()
+        self.follower.reset()
+
+    def gain_db(self, key):
+        """Smoothed gain change in dB for the next block of key signal."""
+        level_db = linear_to_db(self.detector.process(key))
+        return self.follower.process(gain_computer(level_db, self.threshold, self.ratio, self.knee_width))
+
+    def process(self, block, key=None):
+        """Compress the next block, detecting on key (default: block itself)."""
+        gain_db = self.gain_db(block if key is None else key)
+        return apply_gain(block, gain_db, self.makeup)
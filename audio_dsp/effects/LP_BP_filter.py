@@ -1,17 +1,21 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
+from audio_dsp.kernels import ladder_filter, ladder_coefficients, LADDER_LOWPASS, LADDER_BANDPASS
 
-def filter_effect(input_signal, sample_rate=44100, cutoff=1500, resonance=0.7, q=1.0, filter_type="lowpass"):
+def filter_effect(input_signal, sample_rate=44100, cutoff=1500, resonance=0.7, q=1.0, filter_type="lowpass",
+                  control_rate=None):
     """
     Apply a 4-pole resonant filter effect to an input signal.
     
     Args:
         input_signal: Input audio array (mono, normalized to ±1)
         sample_rate: Sample rate in Hz (default 44100)
-        cutoff: Filter cutoff frequency in Hz (50–5000)
+        cutoff: Filter cutoff frequency in Hz (50–5000), or a per-sample array
         resonance: Resonance amplitude (0–5)
         q: Q factor (0.1–10) - bandwidth control
         filter_type: 'lowpass' or 'bandpass' (default 'lowpass')
+        control_rate: For an array cutoff, recompute coefficients every N
+            samples and interpolate in between (default None = every sample)
     
     Returns:
         Output audio array with filter effect applied
@@ -29,36 +33,13 @@ def filter_effect(input_signal, sample_rate=44100, cutoff=1500, resonance=0.7, q
     # Resonance amplitude
     res_amplitude = resonance * 0.25 * (1 + np.exp(0.5 * resonance))
     
-    # Filter state
-    y0, y1, y2, y3 = 0.0, 0.0, 0.0, 0.0
-    output = np.zeros_like(signal)
+    modes = {"lowpass": LADDER_LOWPASS, "bandpass": LADDER_BANDPASS}
+    if filter_type not in modes:
+        raise ValueError("filter_type must be 'lowpass' or 'bandpass'")
     
     # Process signal
-    for i in range(total_samples):
-        wc = 2 * np.pi * cutoff / sample_rate
-        alpha = np.sin(wc) / q
-        input_sample = signal[i]
-        
-        if filter_type == "lowpass":
-            feedback = res_amplitude * y3
-            y0 = np.tanh(y0 + alpha * (input_sample - feedback - y0))
-            y1 = np.tanh(y1 + alpha * (y0 - y1))
-            y2 = np.tanh(y2 + alpha * (y1 - y2))
-            y3 = np.tanh(y3 + alpha * (y2 - y3))
-            y3 *= 0.98  # Slight damping
-            output[i] = y3
-        
-        elif filter_type == "bandpass":
-            feedback = res_amplitude * y3
-            y0 = np.tanh(y0 + alpha * (input_sample - feedback - y0))
-            y1 = np.tanh(y1 + alpha * (y0 - y1))
-            y2 = np.tanh(y2 + alpha * (y1 - y2))
-            y3 = np.tanh(y3 + alpha * (y2 - y3))
-            y3 *= 0.98
-            output[i] = y2 - y3  # Bandpass output
-        
-        else:
-            raise ValueError("filter_type must be 'lowpass' or 'bandpass'")
+    alpha = ladder_coefficients(cutoff, q, sample_rate, control_rate)
+    output = ladder_filter(signal, alpha, res_amplitude, modes[filter_type])
     
     # Normalize
     max_amp = np.max(np.abs(output))
@@ -69,11 +50,11 @@ def filter_effect(input_signal, sample_rate=44100, cutoff=1500, resonance=0.7, q
 
 # Test it
 if __name__ == "__main__":
-    import librosa
+    from audio_dsp.utils import resample_audio
     # Load sample data
     samplerate, data = wavfile.read("input.wav")
     if samplerate != 44100:
-        data = librosa.resample(data.astype(np.float64), orig_sr=samplerate, target_sr=44100)
+        data = resample_audio(data.astype(np.float64), samplerate, 44100)
     if data.ndim > 1:
         data = np.mean(data, axis=1)
     data = data / np.max(np.abs(data))  # Normalize
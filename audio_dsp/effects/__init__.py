@@ -31,7 +31,7 @@ from .distortion import (
     dynamic_triangle_fold_distortion,
     frequency_lock_distortion,
 )
-from .negative_audio import create_negative_waveform, sidechain_compressor
+from .negative_audio import create_negative_waveform, sidechain_compressor, SidechainCompressor
 
 __all__ = [
     # Core filters and distortion
@@ -58,6 +58,7 @@ __all__ = [
     # Core effects
     "create_negative_waveform",
     "sidechain_compressor",
+    "SidechainCompressor",
 ]
 
 # Optional effects requiring librosa
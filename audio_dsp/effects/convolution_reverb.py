@@ -9,7 +9,8 @@ def reverb_effect(input_signal, ir_path, sample_rate=44100, wet_mix=0.5, pre_del
     Apply a high-fidelity convolution reverb effect using an impulse response (WAV or AIFF).
     
     Args:
-        input_signal: Input audio array (mono, normalized to ±1)
+        input_signal: Input audio array, mono (frames,) or multichannel
+            (frames, channels); the IR is applied to all channels at once
         ir_path: Path to impulse response file (WAV or AIFF)
         sample_rate: Sample rate in Hz (default 44100)
         wet_mix: Wet signal mix (0–1, default 0.5 = 50% reverb)
@@ -26,6 +27,7 @@ def reverb_effect(input_signal, ir_path, sample_rate=44100, wet_mix=0.5, pre_del
     if np.max(np.abs(signal)) > 0:
         signal = signal / np.max(np.abs(signal))
     total_samples = len(signal)
+    channel_shape = signal.shape[1:]  # () for mono, (channels,) otherwise
     
     # Load impulse response
     ir_rate, ir = load_audio(ir_path, mono=True)
@@ -65,11 +67,13 @@ def reverb_effect(input_signal, ir_path, sample_rate=44100, wet_mix=0.5, pre_del
     hop_size = frame_size // 2  # 50% overlap for smooth convolution
     num_frames = (total_samples + hop_size - 1) // hop_size + 1
     padded_samples = (num_frames - 1) * hop_size + frame_size + ir_samples - 1
-    signal_padded = np.pad(signal, (0, padded_samples - total_samples), mode='constant')
+    pad_channels = [(0, 0)] * len(channel_shape)
+    signal_padded = np.pad(signal, [(0, padded_samples - total_samples)] + pad_channels, mode='constant')
     output = np.zeros_like(signal_padded)
     
-    # Pre-compute FFT of IR
+    # Pre-compute FFT of IR (broadcast over channels)
     ir_fft = np.fft.fft(ir, n=frame_size + ir_samples - 1)
+    ir_fft = ir_fft.reshape((-1,) + (1,) * len(channel_shape))
     
     for i in range(0, total_samples, hop_size):
         start = i
@@ -78,12 +82,12 @@ def reverb_effect(input_signal, ir_path, sample_rate=44100, wet_mix=0.5, pre_del
             break
         frame = signal_padded[start:end]
         if len(frame) < frame_size:
-            frame = np.pad(frame, (0, frame_size - len(frame)), mode='constant')
+            frame = np.pad(frame, [(0, frame_size - len(frame))] + pad_channels, mode='constant')
         
         # FFT convolution
-        frame_fft = np.fft.fft(frame, n=frame_size + ir_samples - 1)
+        frame_fft = np.fft.fft(frame, n=frame_size + ir_samples - 1, axis=0)
         conv_fft = frame_fft * ir_fft
-        conv_frame = np.real(np.fft.ifft(conv_fft))
+        conv_frame = np.real(np.fft.ifft(conv_fft, axis=0))
         
         # Overlap-add
         output[start:start + len(conv_frame)] += conv_frame
@@ -119,32 +119,36 @@ def dynamic_triangle_fold_distortion(signal, base_gain=5.0, sensitivity=2.0, mix
     return mix * distorted + (1 - mix) * signal
 
 def frequency_lock_distortion(signal, gain=10.0, num_freqs=3, bits=8, mix=1.0):
-    """Distortion that locks onto dominant frequencies, amplifies them brutally, and quantizes."""
+    """Distortion that locks onto dominant frequencies, amplifies them brutally, and quantizes.
+
+    Accepts mono (frames,) or multichannel (frames, channels) input; all
+    channels and STFT frames are processed in one vectorized pass.
+    """
+    # STFT runs along the last axis, so put channels first
+    x = signal.T if signal.ndim > 1 else signal
+
     # Adjust nperseg dynamically based on signal length
-    signal_len = len(signal)
+    signal_len = x.shape[-1]
     nperseg = min(1024, signal_len)  # Use smaller of 1024 or signal length
     noverlap = nperseg // 2
     
-    # Compute STFT
-    f, t, Zxx = stft(signal, fs=SAMPLE_RATE, nperseg=nperseg, noverlap=noverlap)
+    # Compute STFT: shape (..., freqs, frames)
+    f, t, Zxx = stft(x, fs=SAMPLE_RATE, nperseg=nperseg, noverlap=noverlap)
     
     # Magnitude spectrum
     mag = np.abs(Zxx)
+    n_bins = mag.shape[-2]
+    
+    # For each time frame, lock onto top frequencies (fundamental + octave)
+    freq_indices = np.argpartition(mag, -num_freqs, axis=-2)[..., -num_freqs:, :]
+    octave_indices = np.minimum(freq_indices * 2, n_bins - 1)
+    locked = np.zeros(Zxx.shape, dtype=bool)
+    np.put_along_axis(locked, freq_indices, True, axis=-2)
+    np.put_along_axis(locked, octave_indices, True, axis=-2)
     
-    # For each time frame, lock onto top frequencies
-    distorted_Zxx = np.zeros_like(Zxx, dtype=complex)
-    for i in range(mag.shape[1]):
-        freq_indices = np.argpartition(mag[:, i], -num_freqs)[-num_freqs:]
-        octave_indices = []
-        for idx in freq_indices:
-            octave_indices.extend([idx, min(idx * 2, mag.shape[0] - 1)])  # Fundamental + octave
-        octave_indices = np.unique(octave_indices)
-        
-        for idx in octave_indices:
-            distorted_Zxx[idx, i] = Zxx[idx, i] * gain
-            mag_val = np.abs(distorted_Zxx[idx, i])
-            if mag_val > 1.0:
-                distorted_Zxx[idx, i] *= 1.0 / mag_val
+    distorted_Zxx = np.where(locked, Zxx * gain, 0)
+    mag_val = np.abs(distorted_Zxx)
+    distorted_Zxx = np.where(mag_val > 1.0, distorted_Zxx / np.maximum(mag_val, 1.0), distorted_Zxx)
     
     # Quantize the magnitude
     step_size = 1.0 / (2 ** (bits - 1))
@@ -157,11 +161,14 @@ def frequency_lock_distortion(signal, gain=10.0, num_freqs=3, bits=8, mix=1.0):
     _, distorted_signal = istft(distorted_Zxx, fs=SAMPLE_RATE, nperseg=nperseg, noverlap=noverlap)
     
     # Ensure output matches input length
-    if len(distorted_signal) > signal_len:
-        distorted_signal = distorted_signal[:signal_len]
-    elif len(distorted_signal) < signal_len:
-        distorted_signal = np.pad(distorted_signal, (0, signal_len - len(distorted_signal)), 'constant')
+    if distorted_signal.shape[-1] > signal_len:
+        distorted_signal = distorted_signal[..., :signal_len]
+    elif distorted_signal.shape[-1] < signal_len:
+        pad = [(0, 0)] * (distorted_signal.ndim - 1) + [(0, signal_len - distorted_signal.shape[-1])]
+        distorted_signal = np.pad(distorted_signal, pad, 'constant')
     
+    if signal.ndim > 1:
+        distorted_signal = distorted_signal.T
     return mix * distorted_signal + (1 - mix) * signal
 
 def generate_transfer_function(distortion_func, *args, input_range=(-1, 1), points=1000):
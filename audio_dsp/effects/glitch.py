@@ -2,6 +2,7 @@ import numpy as np
 import soundfile as sf
 from scipy.signal import resample, stft, istft
 from audio_dsp.utils import load_audio, normalize_audio
+from audio_dsp.utils import wav_io
 
 def glitch_machine(input_file, output_file, n_segments=32, intensity=0.5, loop_length=2.0):
     """
@@ -12,9 +13,9 @@ def glitch_machine(input_file, output_file, n_segments=32, intensity=0.5, loop_l
     - intensity: Fraction of segments to glitch (0.0–1.0)
     - loop_length: Duration of output loop in seconds
     """
-    # Load WAV
-    sr, audio = load_audio(input_file, mono=True)
-    loop_samples = int(loop_length * sr)
+    # Load WAV (only as much as the loop needs)
+    loop_samples = int(loop_length * wav_io.info(input_file).rate)
+    sr, audio = load_audio(input_file, mono=True, stop=loop_samples)
     
     # Ensure audio fits loop length
     if len(audio) > loop_samples:
@@ -1,6 +1,6 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
-import librosa
+from audio_dsp.utils import resample_audio
 from pydub import AudioSegment
 import os
 
@@ -48,8 +48,8 @@ def lofi_effect(input_signal, sample_rate=44100, drive=5.0, quantize_q=0.3,
     # Anti-alias filter before downsampling
     signal = apply_antialias(signal, reduced_sample_rate / 2)  # Nyquist for target rate
     reduced_samples = int(total_samples * reduced_sample_rate / sample_rate)
-    reduced_signal = librosa.resample(signal, orig_sr=sample_rate, target_sr=reduced_sample_rate)
-    signal = librosa.resample(reduced_signal, orig_sr=reduced_sample_rate, target_sr=sample_rate)
+    reduced_signal = resample_audio(signal, sample_rate, reduced_sample_rate)
+    signal = resample_audio(reduced_signal, reduced_sample_rate, sample_rate)
     signal = signal[:total_samples]  # Trim/pad
     signal = signal / np.max(np.abs(signal))
     print(f"After Sample Rate Reducer max: {np.max(np.abs(signal)):.5f}")
@@ -57,8 +57,8 @@ def lofi_effect(input_signal, sample_rate=44100, drive=5.0, quantize_q=0.3,
     # KBPS Reducer
     kbps_sample_rate = min(11025, int(kbps_rate * 1000 / 32))  # Rough kbps to Hz
     signal = apply_antialias(signal, kbps_sample_rate / 2)  # Anti-alias
-    kbps_signal = librosa.resample(signal, orig_sr=sample_rate, target_sr=kbps_sample_rate)
-    signal = librosa.resample(kbps_signal, orig_sr=kbps_sample_rate, target_sr=sample_rate)
+    kbps_signal = resample_audio(signal, sample_rate, kbps_sample_rate)
+    signal = resample_audio(kbps_signal, kbps_sample_rate, sample_rate)
     signal = signal[:total_samples]
     signal = signal / np.max(np.abs(signal))
     print(f"After KBPS Reducer max: {np.max(np.abs(signal)):.5f}")
@@ -72,7 +72,7 @@ def lofi_effect(input_signal, sample_rate=44100, drive=5.0, quantize_q=0.3,
             audio = AudioSegment.from_mp3("temp.mp3")
         samples = audio.get_array_of_samples()
         signal = np.array(samples, dtype=np.float64) / 32768.0
-        signal = librosa.resample(signal, orig_sr=audio.frame_rate, target_sr=sample_rate)
+        signal = resample_audio(signal, audio.frame_rate, sample_rate)
         signal = signal[:total_samples]
         signal = signal / np.max(np.abs(signal))
         print(f"After MP3er max: {np.max(np.abs(signal)):.5f}")
@@ -90,7 +90,7 @@ if __name__ == "__main__":
     # Load sample data
     samplerate, data = wavfile.read("sequence.wav")
     if samplerate != 44100:
-        data = librosa.resample(data.astype(np.float64), orig_sr=samplerate, target_sr=44100)
+        data = resample_audio(data.astype(np.float64), samplerate, 44100)
     if data.ndim > 1:
         data = np.mean(data, axis=1)
     data = data / np.max(np.abs(data))  # Normalize
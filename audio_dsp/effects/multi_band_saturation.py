@@ -37,7 +37,12 @@ def apply_saturation(signal, drive, fs):
     return saturated / max_saturated * max_abs
 
 def process_multi_band(input_signal, fs, crossovers, drives):
-    """Split signal into bands, apply saturation, and recombine."""
+    """Split signal into bands, apply saturation, and recombine.
+
+    Accepts mono (frames,) or multichannel (frames, channels) input; each
+    band is filtered for all channels at once. Saturation normalization is
+    linked across channels so the stereo image is preserved.
+    """
     expected_bands = len(crossovers) + 1
     if len(drives) != expected_bands:
         raise ValueError(f"Expected {expected_bands} drive values for {expected_bands} bands, got {len(drives)}. "
@@ -47,7 +52,7 @@ def process_multi_band(input_signal, fs, crossovers, drives):
     output = np.zeros_like(input_signal)
     
     for i, (band_name, low, high, sos) in enumerate(filter_bank):
-        band_signal = sosfiltfilt(sos, input_signal)
+        band_signal = sosfiltfilt(sos, input_signal, axis=0)
         drive = drives[i]
         processed = apply_saturation(band_signal, drive, fs)
         output += processed
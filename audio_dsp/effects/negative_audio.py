@@ -1,6 +1,7 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
-from scipy.signal import butter, sosfiltfilt
+from scipy.signal import butter, sosfiltfilt, sosfilt, sosfilt_zi
+from audio_dsp.dynamics import LevelDetector, EnvelopeFollower
 import os
 
 def create_negative_waveform(input_signal):
@@ -22,8 +23,8 @@ def smooth_signal(signal, fs, cutoff_hz=20):
 
 def sidechain_compressor(input_signal, control_signal, fs, threshold=0.2, ratio=10.0, attack_ms=5, release_ms=50):
     """Apply sidechain compression using control signal."""
-    # Use absolute control signal without normalization
-    control = np.abs(control_signal)
+    # Peak level of the control signal, without normalization
+    control = LevelDetector("peak").process(control_signal)
     
     # Amplify control signal for stronger effect
     control = control * 10.0
@@ -31,29 +32,14 @@ def sidechain_compressor(input_signal, control_signal, fs, threshold=0.2, ratio=
     # Smooth control signal
     control = smooth_signal(control, fs, cutoff_hz=100)
     
-    # Initialize gain
-    gain = np.ones_like(input_signal)
-    
-    # Attack and release coefficients
-    attack_coeff = np.exp(-1.0 / (attack_ms * fs / 1000))
-    release_coeff = np.exp(-1.0 / (release_ms * fs / 1000))
-    envelope = 0
-    
     # Compute gain reduction
-    for i in range(len(control)):
-        if control[i] > threshold:
-            target_gain = 1 - (control[i] - threshold) / ratio
-            target_gain = max(target_gain, 0.01)  # Allow deep reduction
-        else:
-            target_gain = 1.0
-        
-        # Smooth gain
-        if target_gain < envelope:
-            coeff = attack_coeff
-        else:
-            coeff = release_coeff
-        envelope = coeff * envelope + (1 - coeff) * target_gain
-        gain[i] = envelope
+    target_gain = np.where(control > threshold,
+                           np.maximum(1 - (control - threshold) / ratio, 0.01),  # Allow deep reduction
+                           1.0)
+    
+    # Smooth gain
+    follower = EnvelopeFollower(fs, attack_ms / 1000, release_ms / 1000, attack_on_rise=False)
+    gain = follower.process(target_gain)
     
     # Apply gain to input
     output = input_signal * gain
@@ -66,6 +52,112 @@ def sidechain_compressor(input_signal, control_signal, fs, threshold=0.2, ratio=
     
     return output, gain, control
 
+class SidechainCompressor:
+    """
+    Streaming sidechain compressor (ducker).
+
+    Same gain law as sidechain_compressor(), but processed block by block
+    with the detector filter, gain smoother and key/main alignment kept
+    between calls, so hours-long material never has to be in memory. The
+    key's lowpass runs forward only (sidechain_compressor uses a zero-phase
+    filter over the whole signal), gain starts at unity, and the output is
+    not RMS-matched.
+
+    The key may arrive decimated: with key_decimation=D, each key sample
+    stands for D main samples and the gain is linearly interpolated
+    between key samples. Streaming then matches one whole call only if
+    every main block is a multiple of D samples long (with len/D key
+    samples); main samples past the last complete key sample are given
+    the last known gain and not revisited. With D=1 any block size works.
+
+    Example:
+        duck = SidechainCompressor(44100, threshold=0.2, ratio=10.0)
+        for voice, bed in blocks:
+            out = duck.process_block(bed, voice)
+    """
+
+    def __init__(self, fs, threshold=0.2, ratio=10.0, attack_ms=5, release_ms=50, key_gain=10.0,
+                 cutoff_hz=100, key_decimation=1):
+        """
+        Parameters:
+        - fs: Sample rate of the main signal
+        - threshold, ratio, attack_ms, release_ms: As in sidechain_compressor()
+        - key_gain: Amplification applied to |key| before detection
+        - cutoff_hz: Detector lowpass cutoff (skipped if at or above the key Nyquist)
+        - key_decimation: Main samples per key sample
+        """
+        self.fs = fs
+        self.threshold = threshold
+        self.ratio = ratio
+        self.key_gain = key_gain
+        self.key_decimation = max(int(key_decimation), 1)
+        key_rate = fs / self.key_decimation
+        self._detector = LevelDetector("peak")
+        self._sos = None
+        if cutoff_hz < key_rate / 2:
+            self._sos = butter(4, cutoff_hz / (key_rate / 2), btype='low', output='sos')
+        self._follower = EnvelopeFollower(key_rate, attack_ms / 1000, release_ms / 1000,
+                                          attack_on_rise=False, initial=1.0)
+        self.reset()
+
+    def reset(self):
+        """Clear all streaming state."""
+        self._follower.reset()
+        self._zi = None
+        # Key-rate gains not yet used up, and the main-sample position of the first one
+        self._gains = np.ones(1)
+        self._first_pos = -1
+        self._n_main = 0
+
+    def key_gain_curve(self, key):
+        """Smoothed key-rate gain for the next block of key signal."""
+        key = np.asarray(key)
+        if key.ndim > 1:
+            key = key.mean(axis=1)
+        control = self._detector.process(key) * self.key_gain
+        if len(control) == 0:
+            return self._follower.process(control)  # sosfilt rejects empty input
+        if self._sos is not None:
+            if self._zi is None:
+                self._zi = sosfilt_zi(self._sos) * (control[0] if len(control) else 0.0)
+            control, self._zi = sosfilt(self._sos, control, zi=self._zi)
+            control = np.abs(control)
+        target_gain = np.where(control > self.threshold,
+                               np.maximum(1 - (control - self.threshold) / self.ratio, 0.01),
+                               1.0)
+        return self._follower.process(target_gain)
+
+    def process_block(self, main, key):
+        """
+        Duck the next block of main under the next block of key.
+
+        main may be (N,) or (N, channels); key is mono or multichannel and
+        len(main) / key_decimation samples long (see the class notes on
+        block sizes). Empty blocks are allowed. Float input keeps its
+        dtype, other input is returned as float32.
+        """
+        main = np.asarray(main)
+        new_gains = self.key_gain_curve(key)
+        d = self.key_decimation
+        # Key sample j is complete at the last main sample it stands for
+        gains = np.concatenate((self._gains, new_gains))
+        positions = self._first_pos + d * np.arange(len(gains))
+
+        n = np.arange(self._n_main, self._n_main + len(main))
+        gain = np.interp(n, positions, gains)
+        self._n_main += len(main)
+
+        # Keep the gains the next block still interpolates from
+        keep = max(np.searchsorted(positions, self._n_main, side='right') - 1, 0)
+        self._gains = gains[keep:]
+        self._first_pos = int(positions[keep])
+
+        dtype = main.dtype if np.issubdtype(main.dtype, np.floating) else np.float32
+        gain = gain.astype(dtype)
+        if main.ndim > 1:
+            gain = gain[:, None]
+        return main.astype(dtype, copy=False) * gain
+
 def visualize_waveforms(input_signal, negative_signal, compressed_signal, gain_signal, control_signal, fs):
     """Plot input, negative, compressed, gain, and control waveforms."""
     import matplotlib.pyplot as plt  # Lazy import for optional dependency
@@ -1,6 +1,7 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
-import librosa
+from audio_dsp.utils import resample_audio
+from audio_dsp.kernels import allpass_first_order
 
 def phaser_flanger_effect(input_signal, sample_rate=44100, phaser_rate=0.5, phaser_depth=0.8, 
                           phaser_stages=4, flanger_delay_base=0.005, flanger_delay_depth=0.005, 
@@ -33,33 +34,18 @@ def phaser_flanger_effect(input_signal, sample_rate=44100, phaser_rate=0.5, phas
     
     # Phaser: All-pass filters with LFO
     phaser_lfo = np.sin(2 * np.pi * phaser_rate * t)  # LFO for phaser cutoff
-    phaser_out = signal.copy()
-    for _ in range(phaser_stages):
-        delayed = np.zeros_like(phaser_out)
-        delayed[0] = phaser_out[0]  # Initialize
-        delayed[1] = phaser_out[1]  # Avoid out-of-bounds
-        for i in range(2, total_samples):
-            # Compute coefficients per sample
-            cutoff = 500 + 4500 * (1 + phaser_depth * phaser_lfo[i])  # Sweep 500–5000 Hz
-            omega = 2 * np.pi * cutoff / sample_rate
-            alpha = np.sin(omega) / (np.cos(omega) + 1.5)  # Stronger phase shift
-            b0, b1, b2 = alpha, -1, 0
-            a0, a1, a2 = 1, -alpha, 0
-            delayed[i] = (b0 * phaser_out[i] + b1 * phaser_out[i-1] + b2 * phaser_out[i-2] - 
-                          a1 * delayed[i-1] - a2 * delayed[i-2]) / a0
-        phaser_out = delayed
+    cutoff = 500 + 4500 * (1 + phaser_depth * phaser_lfo)  # Sweep 500–5000 Hz
+    omega = 2 * np.pi * cutoff / sample_rate
+    alpha = np.sin(omega) / (np.cos(omega) + 1.5)  # Stronger phase shift
+    phaser_out = allpass_first_order(signal, alpha, phaser_stages)
     phaser_out = signal * (1 - phaser_mix) + phaser_out * phaser_mix
     
     # Flanger: Delay with LFO-modulated time
     flanger_lfo = np.sin(2 * np.pi * flanger_rate * t)
-    delay_buffer = np.zeros(total_samples + int(flanger_delay_base * sample_rate + flanger_delay_depth * sample_rate + 1))
-    delay_buffer[:total_samples] = signal
-    flanger_out = signal.copy()
-    for i in range(total_samples):
-        delay_time = flanger_delay_base + flanger_delay_depth * flanger_lfo[i]
-        delay_pos = i - int(delay_time * sample_rate)
-        delayed = delay_buffer[delay_pos] if delay_pos >= 0 and delay_pos < len(delay_buffer) else 0
-        flanger_out[i] = signal[i] + delayed * 1.5  # Boosted feedback for stronger comb
+    delay_samples = (flanger_delay_base + flanger_delay_depth * flanger_lfo) * sample_rate
+    read_pos = np.arange(total_samples) - delay_samples  # Fractional read positions
+    delayed = np.interp(read_pos, np.arange(total_samples), signal, left=0.0, right=0.0)
+    flanger_out = signal + delayed * 1.5  # Boosted feedback for stronger comb
     flanger_out = signal * (1 - flanger_mix) + flanger_out * flanger_mix
     
     # Combine phaser and flanger
@@ -78,7 +64,7 @@ if __name__ == "__main__":
     # Load sample data
     samplerate, data = wavfile.read("input.wav")
     if samplerate != 44100:
-        data = librosa.resample(data.astype(np.float64), orig_sr=samplerate, target_sr=44100)
+        data = resample_audio(data.astype(np.float64), samplerate, 44100)
     if data.ndim > 1:
         data = np.mean(data, axis=1)
     data = data / np.max(np.abs(data))  # Normalize
@@ -84,106 +84,127 @@
 
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
-from scipy import signal
-import matplotlib.pyplot as plt
-import wave
-import struct
+from scipy import signal as signal_lib
+from audio_dsp.dynamics import gain_computer, linear_to_db, db_to_linear
 
-def spectral_flow_compressor(input_file, output_file, threshold=-20, ratio=4.0, viscosity=0.1, window_size=1024, hop_size=256):
-    """
-    Dynamics compressor using spectral energy flow with visualization.
-    
-    Parameters:
-    - input_file: Input WAV file
-    - output_file: Output WAV file
-    - threshold: dB threshold (default -20)
-    - ratio: Compression ratio (default 4.0)
-    - viscosity: Smoothing factor for energy flow (default 0.1)
-    - window_size: STFT window size (default 1024)
-    - hop_size: STFT hop size (default 256)
-    """
-    # Read WAV
-    sample_rate, data = wavfile.read(input_file)
-    if len(data.shape) > 1:
-        data = np.mean(data, axis=1)
-    data = data.astype(float) / np.iinfo(data.dtype).max
+def _analyze(signal, sr, threshold=-20, ratio=4.0, viscosity=0.1, window_size=1024, hop_size=256):
+    """Run the compressor and return its intermediate spectra."""
+    data = np.asarray(signal, dtype=np.float64)
 
     # STFT
-    freqs, times, Zxx = signal.stft(data, fs=sample_rate, nperseg=window_size, noverlap=window_size - hop_size)
+    freqs, times, Zxx = signal_lib.stft(data, fs=sr, nperseg=window_size, noverlap=window_size - hop_size)
     magnitudes = np.abs(Zxx)
     phases = np.angle(Zxx)
     energy = magnitudes**2  # Spectral energy
 
-    # Simplified spectral flow
-    n_freqs, n_times = energy.shape
-    flow_energy = np.zeros_like(energy)
+    # Simplified spectral flow, evaluated for all frames at once: each frame
+    # only depends on its own energy and its neighbours'
+    dt = hop_size / sr
+    following = np.concatenate((energy[:, 2:], energy[:, -1:]), axis=1)  # E[t+1], held at the end
+    dE_dt = (energy[:, 1:] - energy[:, :-1]) / dt
+    smooth = viscosity * (energy[:, :-1] - 2 * energy[:, 1:] + following) / (dt**2)
+    flow_energy = np.empty_like(energy)
     flow_energy[:, 0] = energy[:, 0]  # Initial condition
-
-    # Numerical approximation of energy flow
-    dt = hop_size / sample_rate
-    for t in range(1, n_times):
-        dE_dt = (energy[:, t] - energy[:, t-1]) / dt
-        smooth = viscosity * (energy[:, t-1] - 2 * energy[:, t] + (energy[:, t+1] if t+1 < n_times else energy[:, t])) / (dt**2)
-        flow_energy[:, t] = energy[:, t] + dt * (-dE_dt + smooth)
+    flow_energy[:, 1:] = energy[:, 1:] + dt * (-dE_dt + smooth)
     flow_energy = np.clip(flow_energy, 0, None)
 
     # Envelope and gain reduction
-    envelope_db = 20 * np.log10(np.maximum(np.sqrt(flow_energy), 1e-10))
-    gain_db = np.zeros_like(envelope_db)
-    above_threshold = envelope_db > threshold
-    gain_db[above_threshold] = threshold + (envelope_db[above_threshold] - threshold) / ratio - envelope_db[above_threshold]
-    gain_linear = 10 ** (gain_db / 20.0)
+    envelope_db = linear_to_db(np.sqrt(flow_energy))
+    gain_db = gain_computer(envelope_db, threshold, ratio)
+    gain_linear = db_to_linear(gain_db)
 
     # Apply gain
     compressed_magnitudes = magnitudes * gain_linear
 
     # Reconstruct signal
     Zxx_compressed = compressed_magnitudes * np.exp(1j * phases)
-    _, output = signal.istft(Zxx_compressed, fs=sample_rate, nperseg=window_size, noverlap=window_size - hop_size)
+    _, output = signal_lib.istft(Zxx_compressed, fs=sr, nperseg=window_size, noverlap=window_size - hop_size)
     output = output[:len(data)]
+    return {"freqs": freqs, "times": times, "energy": energy, "flow_energy": flow_energy,
+            "gain_db": gain_db, "compressed_energy": compressed_magnitudes**2, "output": output}
 
-    # Normalize and write WAV
-    output = output / (np.max(np.abs(output)) * 1.1)
-    output = (output * 32767).astype(np.int16)
-    with wave.open(output_file, 'w') as wav_file:
-        wav_file.setparams((1, 2, sample_rate, len(output), 'NONE', 'not compressed'))
-        for sample in output:
-            wav_file.writeframes(struct.pack('h', sample))
+def process(signal, sr, threshold=-20, ratio=4.0, viscosity=0.1, window_size=1024, hop_size=256):
+    """
+    Spectral flow compressor on a mono float array.
+
+    Parameters are as in spectral_flow_compressor(). Returns the compressed
+    signal (not normalized).
+    """
+    return _analyze(signal, sr, threshold, ratio, viscosity, window_size, hop_size)["output"]
+
+def visualize(signal, sr, output_png="spectral_flow_visualization.png", **params):
+    """Plot the spectra and gain of process() to output_png (requires matplotlib)."""
+    _plot(signal, sr, _analyze(signal, sr, **params), output_png)
 
-    # Visualization
+def _plot(signal, sr, result, output_png):
+    """Draw the figure for an _analyze() result."""
+    import matplotlib.pyplot as plt  # Lazy import for optional dependency
+    times, freqs = result["times"], result["freqs"]
     fig, axs = plt.subplots(4, 1, figsize=(12, 12), sharex=True)
 
     # 1. Original Spectral Energy
-    axs[0].pcolormesh(times, freqs, 10 * np.log10(np.maximum(energy, 1e-10)), shading='gouraud', cmap='inferno')
+    axs[0].pcolormesh(times, freqs, 10 * np.log10(np.maximum(result["energy"], 1e-10)), shading='gouraud', cmap='inferno')
     axs[0].set_title("Original Spectral Energy (dB)")
     axs[0].set_ylabel("Frequency (Hz)")
 
     # 2. Flow Energy
-    axs[1].pcolormesh(times, freqs, 10 * np.log10(np.maximum(flow_energy, 1e-10)), shading='gouraud', cmap='inferno')
+    axs[1].pcolormesh(times, freqs, 10 * np.log10(np.maximum(result["flow_energy"], 1e-10)), shading='gouraud', cmap='inferno')
     axs[1].set_title("Flow Energy After Spectral Smoothing (dB)")
     axs[1].set_ylabel("Frequency (Hz)")
 
     # 3. Gain Reduction
-    axs[2].pcolormesh(times, freqs, gain_db, shading='gouraud', cmap='viridis')
+    axs[2].pcolormesh(times, freqs, result["gain_db"], shading='gouraud', cmap='viridis')
     axs[2].set_title("Gain Reduction (dB)")
     axs[2].set_ylabel("Frequency (Hz)")
 
     # 4. Compressed Spectral Energy
-    compressed_energy = compressed_magnitudes**2
-    axs[3].pcolormesh(times, freqs, 10 * np.log10(np.maximum(compressed_energy, 1e-10)), shading='gouraud', cmap='inferno')
+    axs[3].pcolormesh(times, freqs, 10 * np.log10(np.maximum(result["compressed_energy"], 1e-10)), shading='gouraud', cmap='inferno')
     axs[3].set_title("Compressed Spectral Energy (dB)")
     axs[3].set_ylabel("Frequency (Hz)")
     axs[3].set_xlabel("Time (s)")
 
     plt.tight_layout()
-    plt.savefig("spectral_flow_visualization.png")
-    plt.close()
+    plt.savefig(output_png)
+    plt.close(fig)
+
+def spectral_flow_compressor(input_file, output_file, threshold=-20, ratio=4.0, viscosity=0.1, window_size=1024, hop_size=256,
+                             plot_file=None):
+    """
+    Dynamics compressor using spectral energy flow with visualization.
+    
+    Parameters:
+    - input_file: Input WAV file
+    - output_file: Output WAV file
+    - threshold: dB threshold (default -20)
+    - ratio: Compression ratio (default 4.0)
+    - viscosity: Smoothing factor for energy flow (default 0.1)
+    - window_size: STFT window size (default 1024)
+    - hop_size: STFT hop size (default 256)
+    - plot_file: Optional PNG path for a visualization (requires matplotlib)
+    """
+    # Read WAV
+    sample_rate, data = wavfile.read(input_file)
+    if len(data.shape) > 1:
+        data = np.mean(data, axis=1)
+    data = data.astype(float) / np.iinfo(data.dtype).max
+
+    params = dict(threshold=threshold, ratio=ratio, viscosity=viscosity, window_size=window_size, hop_size=hop_size)
+    result = _analyze(data, sample_rate, **params)
+    output = result["output"]
+
+    # Normalize and write WAV
+    output = output / (np.max(np.abs(output)) * 1.1)
+    wavfile.write(output_file, sample_rate, (output * 32767).astype(np.int16))
+
+    if plot_file is not None:
+        _plot(data, sample_rate, result, plot_file)
 
 def main():
     input_file = "input.wav"  # Replace with your WAV
     output_file = "spectral_flow_compressed.wav"
     print("Processing with spectral flow compressor...")
-    spectral_flow_compressor(input_file, output_file, threshold=-50, ratio=4.0, viscosity=0.1)
+    spectral_flow_compressor(input_file, output_file, threshold=-50, ratio=4.0, viscosity=0.1,
+                             plot_file="spectral_flow_visualization.png")
     print(f"Created: {output_file}")
     print("Visualization saved as 'spectral_flow_visualization.png'")
 
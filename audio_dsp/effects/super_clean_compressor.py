@@ -117,125 +117,178 @@
 #                         release=0.01, output_gain=5.0, limit=False)
 
 
-import librosa
 import numpy as np
 import soundfile as sf
+from audio_dsp.utils.audio_io import Resampler
+from audio_dsp.dynamics import (db_to_linear, linear_to_db, gain_computer, apply_gain, LevelDetector,
+                                EnvelopeFollower)
 
 class SuperCleanCompressor:
     def __init__(self, sample_rate=44100, oversample_factor=2):
         self.sample_rate = sample_rate
         self.oversample_factor = oversample_factor
         self.effective_sr = sample_rate * oversample_factor
+        self._upsampler = Resampler(sample_rate, self.effective_sr)
+        self._downsampler = Resampler(self.effective_sr, sample_rate)
 
     def dB_to_linear(self, dB):
-        return 10 ** (dB / 20)
+        return db_to_linear(dB)
 
     def linear_to_dB(self, linear):
-        return 20 * np.log10(np.maximum(linear, 1e-10))
+        return linear_to_db(linear)
 
-    def compress(self, input_file, output_file, mode="transparent", input_gain=0.0, threshold=-20.0, 
-                 ratio=4.0, attack=0.01, release=0.1, knee_width=6.0, output_gain=0.0, limit=False):
+    def knee_gain_reduction(self, level_db, threshold_db, ratio, knee_width, knee="legacy"):
         """
-        State-of-the-art compression with vintage or transparent mode.
-        - input_file: Input WAV file path
-        - output_file: Output WAV file path
-        - mode: 'vintage' or 'transparent'
-        - input_gain: Input boost in dB
-        - threshold: Compression threshold in dB
-        - ratio: Compression ratio (e.g., 4.0 = 4:1)
-        - attack: Attack time in seconds
-        - release: Base release time in seconds (adaptive in vintage)
-        - knee_width: Knee transition width in dB (e.g., 6.0 = ±3 dB)
-        - output_gain: Output gain in dB
-        - limit: True to hard-limit at 0 dBFS
+        Static gain reduction in dB (<= 0) for each detector level in dB.
+
+        knee='legacy' is this compressor's original curve: the knee starts
+        knee_width/2 below the threshold, and the linear part is offset by
+        that amount (so it steps at the top of the knee). knee='centered'
+        uses dynamics.gain_computer, a continuous knee centered on the
+        threshold. Both agree for knee_width=0.
         """
-        # Load audio
-        audio, sr = sf.read(input_file)
-        if sr != self.sample_rate:
-            audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sample_rate)
-        if audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
-        
-        # Oversample
-        audio = librosa.resample(audio, orig_sr=self.sample_rate, target_sr=self.effective_sr)
-        total_samples = len(audio)
+        if knee == "centered":
+            return gain_computer(level_db, threshold_db, ratio, knee_width)
+        if knee != "legacy":
+            raise ValueError("knee must be 'legacy' or 'centered'")
+        level_db = np.asarray(level_db, dtype=np.float64)
+        slope = 1 - 1 / ratio
+        gain_reduction_db = np.zeros_like(level_db)
+        # Only levels past the start of the knee are reduced
+        active = level_db > threshold_db - knee_width / 2
+        excess_db = level_db[active] - (threshold_db - knee_width / 2)
+        if knee_width <= 0 or slope == 0:
+            gain_reduction_db[active] = -excess_db * slope
+            return gain_reduction_db
+        gain_reduction_db[active] = np.where(excess_db > knee_width, -excess_db * slope,
+                                             -0.5 * excess_db**2 / (knee_width * slope))
+        return gain_reduction_db
+
+    def process(self, signal, sr=None, mode="transparent", input_gain=0.0, threshold=-20.0, 
+                ratio=4.0, attack=0.01, release=0.1, knee_width=6.0, output_gain=0.0, limit=False,
+                lookahead=0.0, oversample=True, detector=None, knee="legacy"):
+        """
+        Compress a mono array and return the result at the input rate.
+
+        Takes the same parameters as compress(), plus:
+        - sr: Sample rate of signal (default self.sample_rate)
+        - lookahead: Seconds the dry path is delayed behind the detector, so
+          gain reduction is already in place when a transient arrives. The
+          delay is compensated, so the output stays aligned with the input.
+        - oversample: Run the detector and gain stage at oversample_factor
+          times the rate (cached polyphase resampler)
+        - detector: 'peak', 'rms' (10 ms window) or 'true_peak'; default 'rms'
+          in vintage mode and 'peak' in transparent mode
+        - knee: 'legacy' (default, the original curve) or 'centered'
+          (dynamics.gain_computer); see knee_gain_reduction()
+        """
+        audio = np.asarray(signal, dtype=np.float64)
+        sr = self.sample_rate if sr is None else sr
+        factor = self.oversample_factor if oversample else 1
+        if factor > 1:
+            if sr == self.sample_rate:
+                upsampler, downsampler = self._upsampler, self._downsampler
+            else:
+                upsampler, downsampler = Resampler(sr, sr * factor), Resampler(sr * factor, sr)
+            audio = upsampler.resample(audio).astype(np.float64)
+        rate = sr * factor
         
         # Apply input gain
-        input_gain_linear = self.dB_to_linear(input_gain)
-        audio = audio * input_gain_linear
-        print(f"Input max amp after gain: {np.max(np.abs(audio)):.5f}")
+        audio = audio * self.dB_to_linear(input_gain)
         
-        # Level detection
-        if mode == "vintage":
-            rms_window = int(0.01 * self.effective_sr)
-            rms = np.sqrt(np.convolve(audio**2, np.ones(rms_window)/rms_window, mode='same'))
-            level = rms
-        else:
-            level = np.abs(audio)
-        print(f"Level max: {np.max(level):.5f}")
+        # Level detection, advanced so the RMS window is centered and the
+        # true-peak filter delay is compensated
+        if detector is None:
+            detector = "rms" if mode == "vintage" else "peak"
+        level_detector = LevelDetector(detector, window=int(0.01 * rate))
+        shift = (level_detector.window - 1) // 2 if detector == "rms" else level_detector.latency
+        level = level_detector.process(audio)
+        if shift:
+            level = np.concatenate((level, level_detector.process(np.zeros(shift))))[shift:]
         
         # Gain reduction in dB
-        threshold_linear = self.dB_to_linear(threshold)
-        gain_reduction_db = np.zeros_like(level)
-        for i in range(len(level)):
-            level_db = self.linear_to_dB(level[i])
-            thresh_db = self.linear_to_dB(threshold_linear)
-            if level_db > thresh_db - knee_width/2:
-                excess_db = level_db - thresh_db + knee_width/2
-                if excess_db > knee_width:  # Above knee
-                    gain_reduction_db[i] = -excess_db * (1 - 1/ratio)
-                elif excess_db > 0:  # In knee
-                    gain_reduction_db[i] = -0.5 * (excess_db**2) / (knee_width * (1 - 1/ratio))
-        
-        print(f"Raw GR max: {np.min(gain_reduction_db):.5f} dB")
-        
-        # Smooth gain reduction with adaptive release
-        attack_samples = int(attack * self.effective_sr)
-        release_samples = int(release * self.effective_sr)
-        smoothed_gr_db = np.zeros_like(gain_reduction_db)
-        current_gr = 0.0
-        for i in range(len(gain_reduction_db)):
-            target_gr = gain_reduction_db[i]
-            if target_gr < current_gr:  # Attack
-                alpha = np.exp(-1.0 / attack_samples)
-            else:  # Release (adaptive in vintage)
-                if mode == "vintage" and i > 0:
-                    delta = abs(level[i] - level[i-1])
-                    adaptive_release = release_samples * (1 + delta * 10)  # Faster on peaks
-                    alpha = np.exp(-1.0 / min(adaptive_release, release_samples * 5))
-                else:
-                    alpha = np.exp(-1.0 / release_samples)
-            current_gr = alpha * current_gr + (1 - alpha) * target_gr
-            smoothed_gr_db[i] = current_gr
-        
-        print(f"Smoothed GR max: {np.min(smoothed_gr_db):.5f} dB")
+        gain_reduction_db = self.knee_gain_reduction(self.linear_to_dB(level), threshold, ratio,
+                                                     knee_width, knee)
+        
+        # Smooth gain reduction with adaptive release; time constants are
+        # whole samples at the processing rate
+        attack_samples, release_samples = int(attack * rate), int(release * rate)
+        follower = EnvelopeFollower(1, attack_samples, release_samples, attack_on_rise=False)
+        release_alpha = None
+        if mode == "vintage":
+            release_samples = max(release_samples, 1)
+            release_alpha = np.full(len(level), follower.release_coeff)
+            delta = np.abs(np.diff(level))
+            adaptive_release = release_samples * (1 + delta * 10)  # Faster on peaks
+            release_alpha[1:] = np.exp(-1.0 / np.minimum(adaptive_release, release_samples * 5))
+        smoothed_gr_db = follower.process(gain_reduction_db, release_alpha)
+        
+        # Lookahead: the dry sample at i meets the gain the detector reached at i + delay
+        delay = int(lookahead * rate)
+        if delay > 0 and len(smoothed_gr_db):
+            smoothed_gr_db = np.concatenate((smoothed_gr_db[delay:],
+                                             np.full(min(delay, len(smoothed_gr_db)), smoothed_gr_db[-1])))
         
         # Apply gain reduction
-        gain_linear = self.dB_to_linear(smoothed_gr_db)
-        output = audio * gain_linear
-        print(f"Output max amp pre-gain: {np.max(np.abs(output)):.5f}")
+        output = apply_gain(audio, smoothed_gr_db)
         
         # Vintage saturation (asymmetric)
         if mode == "vintage":
-            output = np.tanh(output * 1.5 + 0.1 * output**3) / 1.5  # Add cubic warmth
+            output = np.tanh(output * 1.5 + 0.1 * (output * output * output)) / 1.5  # Add cubic warmth
         
-        # Output gain
-        output_gain_linear = self.dB_to_linear(output_gain)
-        output *= output_gain_linear
-        print(f"Output max amp pre-limit: {np.max(np.abs(output)):.5f}")
+        # Output (makeup) gain
+        if output_gain == "auto":
+            output_gain = -float(self.knee_gain_reduction(0.0, threshold, ratio, knee_width, knee))
+        output = apply_gain(output, 0.0, output_gain)
         
         # Limiter
         if limit:
             output = np.clip(output, -1.0, 1.0)
-            print(f"Output max amp post-limit: {np.max(np.abs(output)):.5f}")
         
         # Downsample
-        output = librosa.resample(output, orig_sr=self.effective_sr, target_sr=self.sample_rate)
+        if factor > 1:
+            output = downsampler.resample(output)
         
         # Normalize if needed
-        if not limit and np.max(np.abs(output)) > 1.0:
-            output = output / np.max(np.abs(output))
-            print(f"Output max amp post-normalize: {np.max(np.abs(output)):.5f}")
+        max_amp = np.max(np.abs(output)) if len(output) else 0
+        if not limit and max_amp > 1.0:
+            output = output / max_amp
+        return output
+
+    def compress(self, input_file, output_file, mode="transparent", input_gain=0.0, threshold=-20.0, 
+                 ratio=4.0, attack=0.01, release=0.1, knee_width=6.0, output_gain=0.0, limit=False,
+                 lookahead=0.0, detector=None, knee="legacy"):
+        """
+        State-of-the-art compression with vintage or transparent mode.
+        - input_file: Input WAV file path
+        - output_file: Output WAV file path
+        - mode: 'vintage' or 'transparent'
+        - input_gain: Input boost in dB
+        - threshold: Compression threshold in dB
+        - ratio: Compression ratio (e.g., 4.0 = 4:1)
+        - attack: Attack time in seconds
+        - release: Base release time in seconds (adaptive in vintage)
+        - knee_width: Knee transition width in dB (e.g., 6.0 = ±3 dB)
+        - output_gain: Output gain in dB, or 'auto' to make up the gain
+          reduction of a 0 dBFS level
+        - limit: True to hard-limit at 0 dBFS
+        - lookahead: Detector lookahead in seconds (default 0)
+        - detector: 'peak', 'rms' or 'true_peak' (default by mode)
+        - knee: 'legacy' (default) keeps the original knee curve, so output
+          matches earlier releases; 'centered' uses the continuous soft knee
+          of dynamics.gain_computer, which reduces less above the knee
+        """
+        # Load audio
+        audio, sr = sf.read(input_file)
+        if sr != self.sample_rate:
+            audio = Resampler(sr, self.sample_rate).resample(audio)
+        if audio.ndim > 1:
+            audio = np.mean(audio, axis=1)
+        
+        output = self.process(audio, self.sample_rate, mode=mode, input_gain=input_gain,
+                              threshold=threshold, ratio=ratio, attack=attack, release=release,
+                              knee_width=knee_width, output_gain=output_gain, limit=limit,
+                              lookahead=lookahead, detector=detector, knee=knee)
         
         # Save
         sf.write(output_file, output, self.sample_rate, subtype='PCM_16')
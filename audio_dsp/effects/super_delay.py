@@ -1,7 +1,8 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
+from audio_dsp.utils import resample_audio
 from scipy import interpolate  # Added missing import
-import librosa
+from scipy.signal import lfilter
 
 class SuperDelay:
     def __init__(self, sample_rate=44100):
@@ -56,37 +57,54 @@ class SuperDelay:
         return 0.5 * signal + 0.5 * saturated
 
     def _simple_compressor(self, signal, threshold=0.7, ratio=4.0):
-        output = signal.copy()
-        for i in range(len(signal)):
-            if abs(signal[i]) > threshold:
-                gain = threshold + (abs(signal[i]) - threshold) / ratio
-                output[i] = np.sign(signal[i]) * gain if signal[i] != 0 else 0
+        magnitude = np.abs(signal)
+        output = np.where(magnitude > threshold,
+                          np.sign(signal) * (threshold + (magnitude - threshold) / ratio),
+                          signal)
         return output / np.max(np.abs(output))
 
-    def delay(self, input_file, output_file, delay_time=0.25, feedback=0.7, mix=0.5, 
-              mode="digital", lp_cutoff=3000, flutter_base_rate=5.0, flutter_depth=0.005, 
-              pitch_drift_depth=0.1, drive=2.0, resonance=0.7, q=1.0, threshold=0.7, ratio=4.0):
-        # Load audio
-        samplerate, audio = wavfile.read(input_file)
-        if samplerate != self.sample_rate:
-            audio = librosa.resample(audio.astype(np.float64), orig_sr=samplerate, target_sr=self.sample_rate)
-        if audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
-        audio = audio / np.max(np.abs(audio))  # Normalize
-        
+    def _feedback_delay(self, audio, delay_samples, feedback):
+        """
+        Feedback comb y[i] = x[i] + feedback * y[i - delay_samples].
+
+        y only reads samples at least delay_samples back, so each block of
+        delay_samples is computed in one vector operation from the block
+        before it. Very short delays go through lfilter instead.
+        """
         total_samples = len(audio)
+        if delay_samples <= 0:
+            return audio.copy()
+        if delay_samples < 64:
+            a = np.zeros(delay_samples + 1)
+            a[0] = 1.0
+            a[delay_samples] = -feedback
+            return lfilter([1.0], a, audio, axis=0)
+        delayed_buffer = audio.copy()
+        for start in range(delay_samples, total_samples, delay_samples):
+            end = min(start + delay_samples, total_samples)
+            delayed_buffer[start:end] += feedback * delayed_buffer[start - delay_samples:end - delay_samples]
+        return delayed_buffer
+
+    def process(self, audio, delay_time=0.25, feedback=0.7, mix=0.5, mode="digital", lp_cutoff=3000, 
+                flutter_base_rate=5.0, flutter_depth=0.005, pitch_drift_depth=0.1, drive=2.0, 
+                resonance=0.7, q=1.0, threshold=0.7, ratio=4.0):
+        """
+        Apply the delay to a mono array at self.sample_rate.
+
+        Takes the same parameters as delay() and returns the normalized
+        float64 output instead of writing a file.
+        """
+        audio = np.asarray(audio, dtype=np.float64)
+        max_amp = np.max(np.abs(audio)) if len(audio) else 0
+        if max_amp > 0:
+            audio = audio / max_amp  # Normalize
+        
         delay_samples = int(delay_time * self.sample_rate)
-        output = np.zeros(total_samples)
-        delayed_buffer = np.zeros(total_samples + delay_samples)
         
-        # Process raw delay into delayed_buffer
-        for i in range(total_samples):
-            delay_pos = i - delay_samples
-            delayed = delayed_buffer[delay_pos] if delay_pos >= 0 and delay_pos < len(delayed_buffer) else 0
-            delayed_buffer[i] = audio[i] + feedback * delayed
+        # Process raw delay
+        wet_signal = self._feedback_delay(audio, delay_samples, feedback)
         
         # Apply analog effects to delayed signal
-        wet_signal = delayed_buffer[:total_samples]
         if mode == "analog":
             wet_signal = self.pitch_drift(wet_signal, drift_depth=pitch_drift_depth, drift_rate=0.05)
             wet_signal = self.flutter_effect(wet_signal, base_rate=flutter_base_rate, rate_diff=1.0, 
@@ -96,13 +114,28 @@ class SuperDelay:
             wet_signal = self._simple_compressor(wet_signal, threshold=threshold, ratio=ratio)
         
         # Mix dry and wet
-        for i in range(total_samples):
-            output[i] = audio[i] * (1 - mix) + wet_signal[i] * mix
+        output = audio * (1 - mix) + wet_signal * mix
 
         # Normalize
-        max_amp = np.max(np.abs(output))
+        max_amp = np.max(np.abs(output)) if len(output) else 0
         if max_amp > 0:
             output = output / max_amp
+        return output
+
+    def delay(self, input_file, output_file, delay_time=0.25, feedback=0.7, mix=0.5, 
+              mode="digital", lp_cutoff=3000, flutter_base_rate=5.0, flutter_depth=0.005, 
+              pitch_drift_depth=0.1, drive=2.0, resonance=0.7, q=1.0, threshold=0.7, ratio=4.0):
+        # Load audio
+        samplerate, audio = wavfile.read(input_file)
+        if samplerate != self.sample_rate:
+            audio = resample_audio(audio.astype(np.float64), samplerate, self.sample_rate)
+        if audio.ndim > 1:
+            audio = np.mean(audio, axis=1)
+        
+        output = self.process(audio, delay_time=delay_time, feedback=feedback, mix=mix, mode=mode, 
+                              lp_cutoff=lp_cutoff, flutter_base_rate=flutter_base_rate, 
+                              flutter_depth=flutter_depth, pitch_drift_depth=pitch_drift_depth, 
+                              drive=drive, resonance=resonance, q=q, threshold=threshold, ratio=ratio)
         
         # Save
         wavfile.write(output_file, self.sample_rate, output.astype(np.float32))
@@ -1,30 +1,12 @@
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
 import scipy.signal
-import matplotlib.pyplot as plt
-import wave
-import struct
+from scipy.ndimage import maximum_filter1d
+from audio_dsp.dynamics import EnvelopeFollower, gain_computer, linear_to_db, db_to_linear
 
-def topological_compressor(input_file, output_file, threshold=-20, ratio=4.0, persistence_scale=0.1):
-    """
-    Dynamics compressor approximating topological features without persistent homology.
-    
-    Parameters:
-    - input_file: Input WAV file
-    - output_file: Output WAV file
-    - threshold: dB threshold (default -20)
-    - ratio: Compression ratio (default 4.0)
-    - persistence_scale: Minimum prominence for significant peaks (default 0.1)
-    """
-    # Read WAV
-    sample_rate, data = wavfile.read(input_file)
-    if len(data.shape) > 1:
-        data = np.mean(data, axis=1)
-    data = data.astype(float) / np.iinfo(data.dtype).max
-
-    # Phase space embedding
-    derivative = np.diff(data, prepend=data[0]) * sample_rate
-    point_cloud = np.vstack((data, derivative)).T
+def _analyze(signal, sr, threshold=-20, ratio=4.0, persistence_scale=0.1):
+    """Run the compressor and return its intermediate curves."""
+    data = np.asarray(signal, dtype=np.float64)
 
     # Approximate topological features with peak detection
     envelope = np.abs(data)
@@ -32,77 +14,115 @@ def topological_compressor(input_file, output_file, threshold=-20, ratio=4.0, pe
     prominences = properties['prominences']
     persistent_mask = prominences > persistence_scale  # Filter by prominence
     time_indices = peaks[persistent_mask]
-    persistent_points = np.array([[data[i], 0] for i in time_indices])  # Mimic persistence diagram
 
-    # Envelope based on persistent-like peaks
-    smoothed_envelope = np.copy(envelope)
-    for idx in time_indices:
-        window = slice(max(0, idx-50), min(len(data), idx+50))
-        smoothed_envelope[window] = np.maximum(smoothed_envelope[window], envelope[idx])
+    # Envelope based on persistent-like peaks: hold each peak over the 100 samples around it
+    peak_levels = np.zeros_like(envelope)
+    peak_levels[time_indices] = envelope[time_indices]
+    smoothed_envelope = np.maximum(envelope, maximum_filter1d(peak_levels, 100, mode='constant', origin=-1))
 
     # Smooth with attack/release
     attack = 0.01
     release = 0.1
-    attack_coeff = np.exp(-1.0 / (attack * sample_rate))
-    release_coeff = np.exp(-1.0 / (release * sample_rate))
-    for i in range(1, len(smoothed_envelope)):
-        coeff = attack_coeff if smoothed_envelope[i] > smoothed_envelope[i-1] else release_coeff
-        smoothed_envelope[i] = coeff * smoothed_envelope[i-1] + (1 - coeff) * smoothed_envelope[i]
+    smoothed_envelope = EnvelopeFollower(sr, attack, release, initial=None).process(smoothed_envelope)
 
     # Gain reduction
-    envelope_db = 20 * np.log10(np.maximum(smoothed_envelope, 1e-10))
-    gain_db = np.zeros_like(envelope_db)
-    above_threshold = envelope_db > threshold
-    gain_db[above_threshold] = threshold + (envelope_db[above_threshold] - threshold) / ratio - envelope_db[above_threshold]
-    gain_linear = 10 ** (gain_db / 20.0)
+    gain_db = gain_computer(linear_to_db(smoothed_envelope), threshold, ratio)
+    gain_linear = db_to_linear(gain_db)
 
     # Apply gain
     output = data * gain_linear
+    return {"envelope": envelope, "smoothed_envelope": smoothed_envelope, "peaks": time_indices,
+            "gain_db": gain_db, "output": output}
 
-    # Normalize and write WAV
-    output = output / (np.max(np.abs(output)) * 1.1)
-    output = (output * 32767).astype(np.int16)
-    with wave.open(output_file, 'w') as wav_file:
-        wav_file.setparams((1, 2, sample_rate, len(output), 'NONE', 'not compressed'))
-        for sample in output:
-            wav_file.writeframes(struct.pack('h', sample))
+def process(signal, sr, threshold=-20, ratio=4.0, persistence_scale=0.1):
+    """
+    Topological dynamics compressor on a mono float array.
+
+    Parameters are as in topological_compressor(). Returns the compressed
+    signal (not normalized).
+    """
+    return _analyze(signal, sr, threshold, ratio, persistence_scale)["output"]
+
+def visualize(signal, sr, output_png="topological_compressor_visualization.png", **params):
+    """Plot phase space, envelopes and gain of process() to output_png (requires matplotlib)."""
+    _plot(signal, sr, _analyze(signal, sr, **params), output_png)
+
+def _plot(signal, sr, result, output_png):
+    """Draw the figure for an _analyze() result."""
+    import matplotlib.pyplot as plt  # Lazy import for optional dependency
+    data = np.asarray(signal, dtype=np.float64)
+
+    # Phase space embedding
+    derivative = np.diff(data, prepend=data[0]) * sr
+    persistent_points = data[result["peaks"]]  # Mimic persistence diagram
 
-    # Visualization
     fig, axs = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
 
     # 1. Phase Space Trajectory with Persistent-like Peaks
-    axs[0].plot(point_cloud[:, 0], point_cloud[:, 1], 'b-', alpha=0.3, label='Trajectory')
+    axs[0].plot(data, derivative, 'b-', alpha=0.3, label='Trajectory')
     if len(persistent_points) > 0:
-        axs[0].scatter(persistent_points[:, 0], np.zeros_like(persistent_points[:, 0]), c='red', label='Significant Peaks')
+        axs[0].scatter(persistent_points, np.zeros_like(persistent_points), c='red', label='Significant Peaks')
     axs[0].set_title("Phase Space Trajectory (Amplitude vs. Derivative)")
     axs[0].set_ylabel("Derivative")
     axs[0].legend()
 
     # 2. Original and Smoothed Envelope
-    t = np.arange(len(data)) / sample_rate
-    axs[1].plot(t, envelope, 'b-', alpha=0.5, label='Original Envelope')
-    axs[1].plot(t, smoothed_envelope, 'r-', label='Pseudo-Topological Envelope')
+    t = np.arange(len(data)) / sr
+    axs[1].plot(t, result["envelope"], 'b-', alpha=0.5, label='Original Envelope')
+    axs[1].plot(t, result["smoothed_envelope"], 'r-', label='Pseudo-Topological Envelope')
     axs[1].set_title("Envelope with Significant Peak Smoothing")
     axs[1].set_ylabel("Amplitude")
     axs[1].legend()
 
     # 3. Gain Reduction and Output
-    axs[2].plot(t, gain_db, 'g-', label='Gain Reduction (dB)')
-    axs[2].plot(t, output / 32767.0, 'b-', alpha=0.5, label='Compressed Signal')
+    output = result["output"]
+    peak = np.max(np.abs(output)) if len(output) else 0
+    axs[2].plot(t, result["gain_db"], 'g-', label='Gain Reduction (dB)')
+    axs[2].plot(t, output / (peak * 1.1) if peak > 0 else output, 'b-', alpha=0.5, label='Compressed Signal')
     axs[2].set_title("Gain Reduction and Compressed Output")
     axs[2].set_xlabel("Time (s)")
     axs[2].set_ylabel("dB / Amplitude")
     axs[2].legend()
 
     plt.tight_layout()
-    plt.savefig("topological_compressor_visualization.png")
-    plt.close()
+    plt.savefig(output_png)
+    plt.close(fig)
+
+def topological_compressor(input_file, output_file, threshold=-20, ratio=4.0, persistence_scale=0.1, plot_file=None):
+    """
+    Dynamics compressor approximating topological features without persistent homology.
+    
+    Parameters:
+    - input_file: Input WAV file
+    - output_file: Output WAV file
+    - threshold: dB threshold (default -20)
+    - ratio: Compression ratio (default 4.0)
+    - persistence_scale: Minimum prominence for significant peaks (default 0.1)
+    - plot_file: Optional PNG path for a visualization (requires matplotlib)
+    """
+    # Read WAV
+    sample_rate, data = wavfile.read(input_file)
+    if len(data.shape) > 1:
+        data = np.mean(data, axis=1)
+    data = data.astype(float) / np.iinfo(data.dtype).max
+
+    params = dict(threshold=threshold, ratio=ratio, persistence_scale=persistence_scale)
+    result = _analyze(data, sample_rate, **params)
+    output = result["output"]
+
+    # Normalize and write WAV
+    output = output / (np.max(np.abs(output)) * 1.1)
+    wavfile.write(output_file, sample_rate, (output * 32767).astype(np.int16))
+
+    if plot_file is not None:
+        _plot(data, sample_rate, result, plot_file)
 
 def main():
     input_file = "input.wav"  # Replace with your WAV
     output_file = "topological_compressed.wav"
     print("Processing with topological dynamics compressor (workaround mode)...")
-    topological_compressor(input_file, output_file, threshold=-20, ratio=4.0, persistence_scale=0.1)
+    topological_compressor(input_file, output_file, threshold=-20, ratio=4.0, persistence_scale=0.1,
+                           plot_file="topological_compressor_visualization.png")
     print(f"Created: {output_file}")
     print("Visualization saved as 'topological_compressor_visualization.png'")
 
@@ -17,17 +17,19 @@ def generate_carrier(sr, length, type="noise", freq=100):
 
 
 def _frame_audio(audio, frame_length, hop_length):
-    """Frame audio into overlapping segments (replacement for librosa.util.frame)."""
+    """Frame audio into overlapping segments (replacement for librosa.util.frame).
+
+    Returns a strided view of shape (frame_length, n_frames, *channels).
+    """
     n_frames = (len(audio) - frame_length) // hop_length + 1
-    frames = np.zeros((frame_length, n_frames))
-    for i in range(n_frames):
-        start = i * hop_length
-        frames[:, i] = audio[start:start + frame_length]
-    return frames
+    if n_frames <= 0:
+        return np.zeros((frame_length, 0) + audio.shape[1:])
+    windows = np.lib.stride_tricks.sliding_window_view(audio, frame_length, axis=0)
+    return np.moveaxis(windows[::hop_length][:n_frames], -1, 0)
 
 
 def vocoder(carrier, modulator, sr=None, n_filters=32, freq_range=(20, 20000),
-            carrier_type="noise", carrier_freq=100, output_file=None):
+            carrier_type="noise", carrier_freq=100, output_file=None, mono=True):
     """
     Vocoder with band-pass filters, using shortest input length.
 
@@ -41,27 +43,38 @@ def vocoder(carrier, modulator, sr=None, n_filters=32, freq_range=(20, 20000),
     - carrier_type: 'noise' or 'sawtooth' if carrier is None
     - carrier_freq: Frequency for sawtooth carrier (Hz)
     - output_file: Path to output WAV (optional, if None returns array)
+    - mono: Mix inputs down to mono (default True). If False, (frames, channels)
+      inputs are vocoded per channel in one vectorized pass; a mono carrier or
+      modulator is shared across the channels of the other.
 
     Returns:
     - Vocoded audio as numpy array (if output_file is None)
     """
     # Load or use modulator
-    sr, modulator = load_audio(modulator, sr=sr, mono=True)
+    sr, modulator = load_audio(modulator, sr=sr, mono=mono)
 
     # Load, generate, or use carrier
     if carrier is None:
         carrier = generate_carrier(sr, len(modulator), type=carrier_type, freq=carrier_freq)
     elif isinstance(carrier, str):
-        sr_carrier, carrier = load_audio(carrier, mono=True)
+        sr_carrier, carrier = load_audio(carrier, mono=mono)
         if sr_carrier != sr:
             carrier = resample_audio(carrier, sr_carrier, sr)
-    # else: carrier is already an array
+    else:
+        _, carrier = load_audio(carrier, sr=sr, mono=mono)
 
     # Use shortest length
     min_length = min(len(modulator), len(carrier))
     modulator = modulator[:min_length]
     carrier = carrier[:min_length]
 
+    # Share a mono input across the channels of a multichannel one
+    if modulator.ndim == 1 and carrier.ndim > 1:
+        modulator = modulator[:, None]
+    elif carrier.ndim == 1 and modulator.ndim > 1:
+        carrier = carrier[:, None]
+    out_shape = np.broadcast_shapes(modulator.shape, carrier.shape)
+
     # Design filter bank (log-spaced center frequencies)
     low_freq, high_freq = freq_range
     center_freqs = np.logspace(np.log10(low_freq), np.log10(high_freq), n_filters)
@@ -69,7 +82,7 @@ def vocoder(carrier, modulator, sr=None, n_filters=32, freq_range=(20, 20000),
     bandwidth = np.concatenate(([center_freqs[0]], bandwidth, [high_freq - center_freqs[-1]]))
 
     # Process each band
-    output = np.zeros(min_length)
+    output = np.zeros(out_shape)
     frame_length = 1024
     hop_length = 256
 
@@ -83,7 +96,7 @@ def vocoder(carrier, modulator, sr=None, n_filters=32, freq_range=(20, 20000),
         sos = butter(4, [f_low, f_high], btype='band', fs=sr, output='sos')
 
         # Filter modulator and get envelope
-        mod_band = sosfilt(sos, modulator)
+        mod_band = sosfilt(sos, modulator, axis=0)
         env_frames = np.abs(_frame_audio(mod_band, frame_length=frame_length, hop_length=hop_length))
         env = np.mean(env_frames, axis=0)
 
@@ -92,10 +105,11 @@ def vocoder(carrier, modulator, sr=None, n_filters=32, freq_range=(20, 20000),
         if len(env) > min_length:
             env = env[:min_length]
         elif len(env) < min_length:
-            env = np.pad(env, (0, min_length - len(env)), 'edge')
+            pad = [(0, min_length - len(env))] + [(0, 0)] * (env.ndim - 1)
+            env = np.pad(env, pad, 'edge')
 
         # Filter carrier and apply envelope
-        car_band = sosfilt(sos, carrier)
+        car_band = sosfilt(sos, carrier, axis=0)
         output += car_band * env
 
     # Normalize output
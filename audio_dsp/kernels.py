@@ -0,0 +1,331 @@
+"""
+Per-sample recursive DSP kernels.
+
+Filters, envelope followers and delay-line feedback cannot be vectorized with
+numpy because every output sample depends on the previous one. Each kernel
+here is written once as a plain loop over float64 arrays. When numba is
+installed the loop is JIT-compiled; otherwise it runs as ordinary Python
+using the scalar math module.
+
+Usage:
+    from audio_dsp.kernels import ladder_filter, LADDER_LOWPASS
+    out = ladder_filter(signal, alpha, res_amplitude, LADDER_LOWPASS)
+
+Set NUMBA_DISABLE_JIT=1 to force the pure-Python path.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit, config as _numba_config
+    HAVE_NUMBA = not _numba_config.DISABLE_JIT
+except ImportError:
+    HAVE_NUMBA = False
+
+__all__ = [
+    "HAVE_NUMBA",
+    "LADDER_LOWPASS",
+    "LADDER_HIGHPASS",
+    "LADDER_BANDPASS",
+    "ladder_filter",
+    "ladder_coefficients",
+    "allpass_first_order",
+    "attack_release",
+    "karplus_strong_loop",
+    "fm_feedback_loop",
+]
+
+LADDER_LOWPASS = 0
+LADDER_HIGHPASS = 1
+LADDER_BANDPASS = 2
+
+
+def _jit(func):
+    """Compile func with numba when available, else return it unchanged."""
+    if HAVE_NUMBA:
+        return njit(cache=True, nogil=True)(func)
+    return func
+
+
+@_jit
+def _ladder_filter(signal, alpha, res_amplitude, mode, out):
+    y0 = 0.0
+    y1 = 0.0
+    y2 = 0.0
+    y3 = 0.0
+    for i in range(signal.shape[0]):
+        a = alpha[i]
+        x = signal[i]
+        feedback = res_amplitude * y3
+        if mode == 1:
+            y0 = math.tanh(x - y0 + a * (x - y0 - feedback))
+        else:
+            y0 = math.tanh(y0 + a * (x - feedback - y0))
+        y1 = math.tanh(y1 + a * (y0 - y1))
+        y2 = math.tanh(y2 + a * (y1 - y2))
+        y3 = math.tanh(y3 + a * (y2 - y3))
+        y3 *= 0.98
+        if mode == 1:
+            out[i] = y0 * 2.0
+        elif mode == 2:
+            out[i] = y2 - y3
+        else:
+            out[i] = y3
+    return out
+
+
+@_jit
+def _allpass_first_order(x, alpha, stages, out):
+    n = x.shape[0]
+    for i in range(min(n, 2)):
+        out[i] = x[i]
+    if n < 2:
+        return out
+    prev_in = np.empty(stages)
+    prev_out = np.empty(stages)
+    for k in range(stages):
+        prev_in[k] = x[1]
+        prev_out[k] = x[1]
+    for i in range(2, n):
+        a = alpha[i]
+        y = x[i]
+        for k in range(stages):
+            stage_in = y
+            y = a * stage_in - prev_in[k] + a * prev_out[k]
+            prev_in[k] = stage_in
+            prev_out[k] = y
+        out[i] = y
+    return out
+
+
+@_jit
+def _attack_release(x, attack_coeff, release_coeff, state, attack_on_rise, out):
+    for i in range(x.shape[0]):
+        target = x[i]
+        if attack_on_rise:
+            attacking = target > state
+        else:
+            attacking = target < state
+        if attacking:
+            coeff = attack_coeff[i]
+        else:
+            coeff = release_coeff[i]
+        state = coeff * state + (1.0 - coeff) * target
+        out[i] = state
+    return out
+
+
+@_jit
+def _karplus_strong_loop(output, period, filter_weight, mute_slope, decay, lengths):
+    for r in range(output.shape[0]):
+        fw = filter_weight[r]
+        ms = mute_slope[r]
+        d = decay[r]
+        for i in range(period, lengths[r]):
+            prev_sample = output[r, i - period]
+            prev_prev_sample = output[r, i - period - 1] if i > period else 0.0
+            m = ms * i
+            output[r, i] = d * ((fw + m * (0.5 - fw)) * prev_sample
+                                + ((1.0 - fw) + m * (fw - 0.5)) * prev_prev_sample)
+    return output
+
+
+def _karplus_strong_blocks(output, period, filter_weight, mute_slope, decay, lengths):
+    # Every sample reads only samples period and period + 1 back, so a whole
+    # period-sized block depends solely on the block before it.
+    rows, n = output.shape
+    fw = filter_weight[:, None]
+    ms = mute_slope[:, None]
+    d = decay[:, None]
+    active = lengths[:, None]
+    for start in range(period, n, period):
+        end = min(start + period, n)
+        cols = np.arange(start, end)
+        m = ms * cols
+        live = cols < active
+        coeff_prev = d * (fw + m * (0.5 - fw)) * live
+        coeff_prev_prev = d * ((1.0 - fw) + m * (fw - 0.5)) * live
+        prev = output[:, start - period:end - period]
+        if start == period:
+            prev_prev = np.concatenate((np.zeros((rows, 1), dtype=output.dtype),
+                                        output[:, :end - period - 1]), axis=1)
+        else:
+            prev_prev = output[:, start - period - 1:end - period - 1]
+        output[:, start:end] = coeff_prev * prev + coeff_prev_prev * prev_prev
+    return output
+
+
+@_jit
+def _fm_feedback_loop(phase, amplitude, external, edge_src, edge_dst, edge_weight, edge_delayed,
+                      state, out):
+    members, notes, n = phase.shape
+    for r in range(notes):
+        for i in range(n):
+            for j in range(members):
+                mod = external[j, r, i]
+                for e in range(edge_src.shape[0]):
+                    if edge_dst[e] == j:
+                        src = edge_src[e]
+                        if edge_delayed[e]:
+                            mod += edge_weight[e] * 0.5 * (state[src, r, 0] + state[src, r, 1])
+                        else:
+                            mod += edge_weight[e] * out[src, r, i]
+                out[j, r, i] = amplitude[j, r, i] * math.sin(phase[j, r, i] + mod)
+            for j in range(members):
+                state[j, r, 1] = state[j, r, 0]
+                state[j, r, 0] = out[j, r, i]
+    return out
+
+
+def _per_sample(value, n):
+    """Broadcast a scalar or array parameter to n float64 samples."""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+
+def ladder_filter(signal, alpha, res_amplitude, mode=LADDER_LOWPASS):
+    """
+    4-stage tanh ladder with resonance feedback from the last stage.
+
+    Args:
+        signal: 1-D input array
+        alpha: Per-sample (or scalar) stage coefficient, sin(wc) / q
+        res_amplitude: Feedback amount from the fourth stage
+        mode: LADDER_LOWPASS, LADDER_HIGHPASS or LADDER_BANDPASS
+
+    Returns:
+        float64 array, same length as signal
+    """
+    signal = np.ascontiguousarray(signal, dtype=np.float64)
+    n = len(signal)
+    out = np.empty(n, dtype=np.float64)
+    return _ladder_filter(signal, _per_sample(alpha, n), float(res_amplitude), int(mode), out)
+
+
+def ladder_coefficients(cutoff, q, sample_rate, control_rate=None):
+    """
+    Stage coefficient sin(2*pi*cutoff/sr) / q for ladder_filter.
+
+    A scalar or constant cutoff is evaluated once and returned as a scalar.
+    With control_rate=N a per-sample cutoff is evaluated every N samples
+    (and at the last sample) and linearly interpolated in between; None
+    evaluates it at every sample.
+    """
+    cutoff = np.asarray(cutoff, dtype=np.float64)
+    if cutoff.size and cutoff.min() == cutoff.max():
+        cutoff = cutoff.flat[0]
+    if cutoff.ndim == 0 or control_rate is None or control_rate <= 1:
+        return np.sin(2 * np.pi * cutoff / sample_rate) / q
+    n = len(cutoff)
+    if n == 0:
+        return np.empty(0)
+    points = np.arange(0, n, int(control_rate))
+    if points[-1] != n - 1:
+        points = np.append(points, n - 1)
+    alpha = np.sin(2 * np.pi * cutoff[points] / sample_rate) / q
+    return np.interp(np.arange(n), points, alpha)
+
+
+def allpass_first_order(x, alpha, stages=1):
+    """
+    Cascade of time-varying first-order all-passes,
+    y[i] = a[i]*x[i] - x[i-1] + a[i]*y[i-1], sharing one coefficient array.
+
+    All stages run in a single pass over x. The first two samples are
+    passed through unchanged by every stage.
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    n = len(x)
+    out = np.empty(n, dtype=np.float64)
+    if stages < 1:
+        out[:] = x
+        return out
+    return _allpass_first_order(x, _per_sample(alpha, n), int(stages), out)
+
+
+def attack_release(x, attack_coeff, release_coeff, initial=None, attack_on_rise=True):
+    """
+    One-pole follower that switches coefficient on the direction of change.
+
+    Args:
+        x: 1-D target signal
+        attack_coeff: Scalar or per-sample pole used while attacking
+        release_coeff: Scalar or per-sample pole used while releasing
+        initial: Starting state. None starts from x[0] and copies it through.
+        attack_on_rise: True for level envelopes (attack when x rises),
+            False for gain curves (attack when x falls below the state)
+
+    Returns:
+        float64 array, same length as x
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    n = len(x)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    attack_coeff = _per_sample(attack_coeff, n)
+    release_coeff = _per_sample(release_coeff, n)
+    if initial is None:
+        out[0] = x[0]
+        _attack_release(x[1:], attack_coeff[1:], release_coeff[1:], x[0],
+                        bool(attack_on_rise), out[1:])
+    else:
+        _attack_release(x, attack_coeff, release_coeff, float(initial),
+                        bool(attack_on_rise), out)
+    return out
+
+
+def karplus_strong_loop(output, period, filter_weight, mute_slope, decay, lengths=None):
+    """
+    Run the Karplus-Strong feedback loop in place from output[:, period:].
+
+    output is (strings, samples) and output[:, :period] must already hold
+    the excitation. Each new sample blends a brightness-weighted and a plain
+    two-tap average of the samples one period back, crossfaded by a mute
+    amount that ramps as mute_slope * i, and scaled by decay.
+
+    Args:
+        output: 2-D float array, modified in place
+        period: Delay-line length in samples, shared by every row
+        filter_weight, mute_slope, decay: Scalars or per-row arrays
+        lengths: Per-row sample counts; samples past a row's length stay zero
+
+    Without numba the recursion runs in period-sized vector blocks.
+    """
+    rows, n = output.shape
+    filter_weight = _per_sample(filter_weight, rows)
+    mute_slope = _per_sample(mute_slope, rows)
+    decay = _per_sample(decay, rows)
+    if lengths is None:
+        lengths = np.full(rows, n, dtype=np.int64)
+    lengths = np.minimum(np.asarray(lengths, dtype=np.int64), n)
+    if HAVE_NUMBA:
+        return _karplus_strong_loop(output, int(period), filter_weight, mute_slope, decay, lengths)
+    return _karplus_strong_blocks(output, int(period), filter_weight, mute_slope, decay, lengths)
+
+
+def fm_feedback_loop(phase, amplitude, external, edges, state):
+    """
+    Evaluate a group of FM operators joined by feedback, one sample at a time.
+
+    Args:
+        phase: (members, notes, samples) carrier phase in radians
+        amplitude: (members, notes, samples) output level times envelope
+        external: (members, notes, samples) summed modulation from outside the group
+        edges: (src, dst, weight, delayed) tuples between members. Members
+            must be ordered so undelayed edges point forward. Delayed edges
+            read the mean of src's previous two outputs, as on the DX7.
+        state: (members, notes, 2) last two outputs per member, updated in place
+
+    Returns:
+        (members, notes, samples) operator outputs
+    """
+    phase = np.ascontiguousarray(phase, dtype=np.float64)
+    out = np.empty(phase.shape, dtype=np.float64)
+    edge_src = np.array([e[0] for e in edges], dtype=np.int64)
+    edge_dst = np.array([e[1] for e in edges], dtype=np.int64)
+    edge_weight = np.array([e[2] for e in edges], dtype=np.float64)
+    edge_delayed = np.array([e[3] for e in edges], dtype=np.bool_)
+    return _fm_feedback_loop(phase, np.ascontiguousarray(amplitude, dtype=np.float64),
+                             np.ascontiguousarray(external, dtype=np.float64),
+                             edge_src, edge_dst, edge_weight, edge_delayed, state, out)
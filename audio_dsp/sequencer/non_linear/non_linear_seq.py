@@ -1,33 +1,25 @@
 import numpy as np
-from audio_dsp.utils import wav_io as wavfile
-from scipy.signal import resample
+from audio_dsp.utils import load_directory
 import matplotlib.pyplot as plt
 import wave
 import struct
 import os
-import glob
 import random
 
-def load_samples(samples_dir, target_rate=44100):
+def load_samples(samples_dir, target_rate=44100, workers=None):
     """Load and resample WAV samples."""
     samples = {}
-    for wav_file in glob.glob(os.path.join(samples_dir, "*.wav")):
-        name = os.path.splitext(os.path.basename(wav_file))[0].lower()
-        try:
-            sample_rate, data = wavfile.read(wav_file)
-            if len(data.shape) > 1:
-                data = data[:, 0]
-            if np.max(np.abs(data)) == 0:
-                print(f"Warning: {name}.wav is silent or corrupted")
-                continue
-            if sample_rate != target_rate:
-                num_samples = int(len(data) * target_rate / sample_rate)
-                data = resample(data, num_samples)
-                sample_rate = target_rate
-            samples[name] = (sample_rate, data / np.max(np.abs(data)))
-            print(f"Loaded {name}.wav: {len(data)} samples, rate {sample_rate}")
-        except Exception as e:
-            print(f"Error loading {wav_file}: {e}")
+    loaded = load_directory(samples_dir, "*.wav", sr=target_rate, mono=False,
+                            workers=workers, skip_errors=True)
+    for filename, data in loaded.items():
+        name = os.path.splitext(filename)[0].lower()
+        if data.ndim > 1:
+            data = data[:, 0]  # Left channel, as before
+        if len(data) == 0 or np.max(np.abs(data)) == 0:
+            print(f"Warning: {name}.wav is silent or corrupted")
+            continue
+        samples[name] = (target_rate, data / np.max(np.abs(data)))
+        print(f"Loaded {name}.wav: {len(data)} samples, rate {target_rate}")
     if not samples:
         print(f"Error: No valid WAV files found in {samples_dir}")
     return samples
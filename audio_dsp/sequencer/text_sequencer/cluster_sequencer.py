@@ -5,20 +5,24 @@ import ast
 import re
 import json
 import random
-from audio_dsp.utils import load_audio, normalize_audio
+from audio_dsp.utils import load_files, normalize_audio
 
-def load_cluster_samples(cluster_file="cluster_mapping.json", samples_dir="samples"):
+def load_cluster_samples(cluster_file="cluster_mapping.json", samples_dir="samples", workers=None):
     """Load samples from clusters, returning audio data and paths."""
     with open(cluster_file, "r") as f:
         cluster_map = json.load(f)
 
+    # Decode every referenced file once, in parallel
+    full_paths = {
+        cluster_id: [os.path.join(samples_dir, os.path.basename(path)) for path in sample_paths]
+        for cluster_id, sample_paths in cluster_map.items()
+    }
+    unique_paths = list(dict.fromkeys(p for paths in full_paths.values() for p in paths))
+    audio_by_path = load_files(unique_paths, workers=workers)
+
     samples = {}
-    for cluster_id, sample_paths in cluster_map.items():
-        samples[cluster_id] = []
-        for path in sample_paths:
-            full_path = os.path.join(samples_dir, os.path.basename(path))
-            sr, audio_data = load_audio(full_path)
-            samples[cluster_id].append((audio_data, full_path))
+    for cluster_id, paths in full_paths.items():
+        samples[cluster_id] = [(audio_by_path[path], path) for path in paths]
     print(f"Loaded clusters: { {k: len(v) for k, v in samples.items()} }")
     return samples
 
@@ -12,6 +12,7 @@ import io
 import tkinter as tk
 import threading
 import json
+from audio_dsp.utils import load_directory
 
 # Parameters
 SAMPLE_DIR = "cluster_samples"  # Folder with .wav files
@@ -22,9 +23,12 @@ NUM_CLUSTERS = 4  # Default number of clusters
 # Initialize pygame for audio
 pygame.mixer.init()
 
-def audio_to_spectrogram(file_path):
+def audio_to_spectrogram(file_path, y=None):
     print(f"Converting {file_path} to spectrogram...")
-    y, sr = librosa.load(file_path, sr=SAMPLE_RATE)
+    if y is None:
+        y, sr = librosa.load(file_path, sr=SAMPLE_RATE)
+    else:
+        sr = SAMPLE_RATE  # Already decoded and resampled by the caller
     S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
     S_dB = librosa.power_to_db(S, ref=np.max)
     
@@ -39,18 +43,19 @@ def audio_to_spectrogram(file_path):
     print(f"Spectrogram generated: {img.size}, mode {img.mode}")
     return np.array(img.convert('L')).flatten(), img
 
-def load_samples(directory):
+def load_samples(directory, workers=None):
     print("Loading samples from directory...")
     samples = []
     spectrograms = []
     images = []
-    for file in os.listdir(directory):
-        if file.endswith('.wav') or file.endswith('.WAV'):
-            path = os.path.join(directory, file)
-            spec_data, spec_img = audio_to_spectrogram(path)
-            samples.append(path)
-            spectrograms.append(spec_data)
-            images.append(spec_img)
+    # Decode and resample in parallel; plotting below stays on this thread
+    decoded = load_directory(directory, "*.wav", sr=SAMPLE_RATE, workers=workers)
+    for file, y in decoded.items():
+        path = os.path.join(directory, file)
+        spec_data, spec_img = audio_to_spectrogram(path, y=np.asarray(y))
+        samples.append(path)
+        spectrograms.append(spec_data)
+        images.append(spec_img)
     print(f"Loaded {len(samples)} samples")
     return samples, np.array(spectrograms), images
 
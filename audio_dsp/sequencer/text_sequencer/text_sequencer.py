@@ -1,17 +1,16 @@
 import numpy as np
 import soundfile as sf
-import os
 import ast
 import re
-from audio_dsp.utils import load_audio, normalize_audio
+from audio_dsp.utils import load_directory, normalize_audio
 
-def load_samples(samples_dir="samples"):
+def load_samples(samples_dir="samples", workers=None):
     samples = {}
-    for filename in os.listdir(samples_dir):
-        if filename.startswith(tuple(f"{i}_" for i in range(1, 10))) and filename.endswith(".wav"):
-            track_num = int(filename.split("_")[0])
-            sr, audio = load_audio(os.path.join(samples_dir, filename))
-            samples[track_num] = audio
+    for filename, audio in load_directory(samples_dir, "[1-9]_*.wav", workers=workers).items():
+        if len(audio) == 0:
+            continue  # Empty sample, nothing to trigger
+        track_num = int(filename.split("_")[0])
+        samples[track_num] = audio
     return samples
 
 def parse_pattern(pattern_file="pattern.txt"):
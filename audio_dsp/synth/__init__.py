@@ -6,13 +6,16 @@ Core synths (no optional dependencies):
 
 Additional synths:
     from audio_dsp.synth import karplus_strong, generate_speech_synth
+    from audio_dsp.synth import FMAlgorithm  # N-operator FM graphs, DX7 algorithms 1-32
 """
 
 from .subtractive_synth import SubtractiveSynth
 from .dx7_fm_synth import DX7FMSynth
+from .fm_engine import FMAlgorithm, DX7_ALGORITHMS
+from .oscillators import Wavetable
 from .super_stacked_synth import SuperStackedSynth
 from .drum_synth import DrumSynth
-from .pluck import karplus_strong, generate_string_pluck
+from .pluck import karplus_strong, karplus_strong_batch, generate_string_pluck
 from .dialup_synth import generate_56k_dialup
 from .speech import generate_speech_synth
 from .chip_tone import (
@@ -29,9 +32,13 @@ from .chip_tone import (
 __all__ = [
     "SubtractiveSynth",
     "DX7FMSynth",
+    "FMAlgorithm",
+    "DX7_ALGORITHMS",
+    "Wavetable",
     "SuperStackedSynth",
     "DrumSynth",
     "karplus_strong",
+    "karplus_strong_batch",
     "generate_string_pluck",
     "generate_56k_dialup",
     "generate_speech_synth",
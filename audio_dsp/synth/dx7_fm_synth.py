@@ -1,5 +1,68 @@
 import numpy as np
 import soundfile as sf
+from functools import lru_cache
+from audio_dsp.synth.fm_engine import FMAlgorithm
+
+# Patch for each algorithm (operators indexed 0–3 = Op1–Op4):
+# - modulation: (source, target) edges; the target's mod index scales the
+#   source. (k, k) is this synth's "feedback": Op k is modulated by a copy of
+#   its own unmodulated sine at mod index * (1 + feedback).
+# - carriers: (operator, gain) pairs summed into the output
+# Operators that do not reach a carrier are left out of the graph.
+_PATCHES = {
+    1: ([], [(0, 1.0)]),                                          # 4 → 3 → 2 → 1
+    2: ([(3, 3), (3, 2)], [(2, 0.5), (0, 0.5)]),                  # (4 → 3) + (2 → 1) → Mix
+    3: ([], [(0, 1.0)]),                                          # (4 + 3) → 2 → 1
+    4: ([(3, 3), (3, 1)], [(0, 1.0), (1, 0.5)]),                  # 4 → (3 + 2) → 1
+    5: ([(3, 3)], [(0, 0.25), (1, 0.25), (2, 0.25), (3, 0.25)]),  # All independent
+}
+
+@lru_cache(maxsize=None)
+def _compile_patch(algorithm):
+    """
+    Build the FMAlgorithm for a patch.
+
+    Returns (fm, slots): slots[j] is (operator, role) for graph operator j,
+    where role is 'carrier', 'modulator' (level = the target's mod index) or
+    'feedback' (the self-modulating copy).
+    """
+    modulation, carriers = _PATCHES[algorithm]
+    slots, slot_of, edges = [], {}, []
+
+    def slot(op, role):
+        slot_of[op] = len(slots)
+        slots.append((op, role))
+        return slot_of[op]
+
+    for op, _ in carriers:
+        slot(op, "carrier")
+    for src, dst in modulation:
+        if src != dst:
+            edges.append((slot(src, "modulator"), slot_of[dst]))
+    for src, dst in modulation:
+        if src == dst:
+            copy = len(slots)
+            slots.append((src, "feedback"))
+            edges.append((copy, slot_of[dst]))
+    fm = FMAlgorithm(len(slots), edges, list(range(len(carriers))))
+    return fm, slots
+
+@lru_cache(maxsize=256)
+def _adsr_envelope(sample_rate, total_samples, attack, decay, sustain, release):
+    """Cached read-only ADSR envelope of total_samples samples."""
+    attack_samples = int(attack * sample_rate)
+    decay_samples = int(decay * sample_rate)
+    release_samples = int(release * sample_rate)
+    sustain_level = sustain
+
+    envelope = np.ones(total_samples)
+    envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
+    envelope[attack_samples:attack_samples + decay_samples] = np.linspace(1, sustain_level, decay_samples)
+    sustain_end = total_samples - release_samples
+    envelope[attack_samples + decay_samples:sustain_end] = sustain_level
+    envelope[sustain_end:] = np.linspace(sustain_level, 0, release_samples)
+    envelope.setflags(write=False)
+    return envelope
 
 class DX7FMSynth:
     def __init__(self, sample_rate=44100):
@@ -25,72 +88,68 @@ class DX7FMSynth:
 
     def apply_adsr(self, duration, attack, decay, sustain, release):
         total_samples = int(self.sample_rate * duration)
-        attack_samples = int(attack * self.sample_rate)
-        decay_samples = int(decay * self.sample_rate)
-        release_samples = int(release * self.sample_rate)
-        sustain_level = sustain
+        return _adsr_envelope(self.sample_rate, total_samples, attack, decay, sustain, release).copy()
 
-        envelope = np.ones(total_samples)
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        envelope[attack_samples:attack_samples + decay_samples] = np.linspace(1, sustain_level, decay_samples)
-        sustain_end = total_samples - release_samples
-        envelope[attack_samples + decay_samples:sustain_end] = sustain_level
-        envelope[sustain_end:] = np.linspace(sustain_level, 0, release_samples)
-        return envelope
+    def _operator_envelope(self, op_index, total_samples):
+        op = self.adsr[op_index]
+        return _adsr_envelope(self.sample_rate, total_samples, op['attack'], op['decay'], 
+                              op['sustain'], op['release'])
 
     def synthesize(self, freq, duration, algorithm=None):
+        return self.synthesize_batch([freq], duration, algorithm=algorithm)[0]
+
+    def synthesize_batch(self, freqs, durations, velocities=None, algorithm=None, chunk_size=8):
+        """
+        Render many notes with the current patch.
+        - freqs: Note frequencies in Hz
+        - durations: Note lengths in seconds (scalar or one per note)
+        - velocities: Output gain per note (0–1, default 1.0)
+        - algorithm: Optional algorithm override (1–5)
+        - chunk_size: Max notes rendered together; bounds peak memory
+        Notes of equal length are rendered together through one
+        fm_engine.FMAlgorithm. Returns a list of arrays in input order, each
+        normalized to a peak of 1 and scaled by its velocity.
+        """
         if algorithm is not None:
             self.algorithm = algorithm
         if not 1 <= self.algorithm <= 5:
             raise ValueError("Algorithm must be 1–5")
         
-        t = np.linspace(0, duration, int(self.sample_rate * duration), endpoint=False)
-        output = np.zeros_like(t)
-        
-        # Generate envelopes for all operators
-        envs = [self.apply_adsr(duration, op['attack'], op['decay'], op['sustain'], op['release'])
-                for op in self.adsr]
-        
-        # Operator signals (sine waves)
-        ops = [np.sin(2 * np.pi * freq * ratio * t) for ratio in self.freq_ratios]
-        
-        # Apply modulation based on algorithm
-        if self.algorithm == 1:  # 4 → 3 → 2 → 1
-            op4 = ops[3] + self.feedback * ops[3]  # Feedback on Op4
-            ops[3] = np.sin(2 * np.pi * freq * self.freq_ratios[3] * t + self.mod_indices[3] * op4)
-            ops[2] = np.sin(2 * np.pi * freq * self.freq_ratios[2] * t + self.mod_indices[2] * ops[3])
-            ops[1] = np.sin(2 * np.pi * freq * self.freq_ratios[1] * t + self.mod_indices[1] * ops[2])
-            output = ops[0] * envs[0]  # Op1 is the carrier
-        
-        elif self.algorithm == 2:  # (4 → 3) + (2 → 1) → Mix
-            op4 = ops[3] + self.feedback * ops[3]
-            ops[3] = np.sin(2 * np.pi * freq * self.freq_ratios[3] * t + self.mod_indices[3] * op4)
-            ops[2] = np.sin(2 * np.pi * freq * self.freq_ratios[2] * t + self.mod_indices[2] * ops[3])
-            ops[1] = np.sin(2 * np.pi * freq * self.freq_ratios[1] * t + self.mod_indices[1] * ops[2])
-            output = (ops[2] * envs[2] + ops[0] * envs[0]) * 0.5
-        
-        elif self.algorithm == 3:  # (4 + 3) → 2 → 1
-            op4 = ops[3] + self.feedback * ops[3]
-            ops[3] = np.sin(2 * np.pi * freq * self.freq_ratios[3] * t + self.mod_indices[3] * op4)
-            ops[2] = np.sin(2 * np.pi * freq * self.freq_ratios[2] * t + self.mod_indices[2] * (ops[3] + ops[2]))
-            ops[1] = np.sin(2 * np.pi * freq * self.freq_ratios[1] * t + self.mod_indices[1] * ops[2])
-            output = ops[0] * envs[0]
-        
-        elif self.algorithm == 4:  # 4 → (3 + 2) → 1
-            op4 = ops[3] + self.feedback * ops[3]
-            ops[3] = np.sin(2 * np.pi * freq * self.freq_ratios[3] * t + self.mod_indices[3] * op4)
-            ops[2] = np.sin(2 * np.pi * freq * self.freq_ratios[2] * t + self.mod_indices[2] * ops[3])
-            ops[1] = np.sin(2 * np.pi * freq * self.freq_ratios[1] * t + self.mod_indices[1] * ops[3])
-            output = ops[0] * envs[0] + ops[1] * envs[1] * 0.5
+        freqs, durations = np.broadcast_arrays(np.atleast_1d(np.asarray(freqs, dtype=np.float64)), 
+                                               np.asarray(durations, dtype=np.float64))
+        velocities = np.broadcast_to(np.asarray(1.0 if velocities is None else velocities, 
+                                                dtype=np.float64), freqs.shape)
+        lengths = (self.sample_rate * durations).astype(np.int64)
         
-        elif self.algorithm == 5:  # All independent
-            op4 = ops[3] + self.feedback * ops[3]
-            ops[3] = np.sin(2 * np.pi * freq * self.freq_ratios[3] * t + self.mod_indices[3] * op4)
-            output = sum(op * env for op, env in zip(ops, envs)) / 4.0
+        fm, slots = _compile_patch(self.algorithm)
+        _, carriers = _PATCHES[self.algorithm]
+        gains = dict(carriers)
+        targets = {src: dst for src, dst in _PATCHES[self.algorithm][0] if src != dst}
+        ratios = [self.freq_ratios[op] for op, _ in slots]
+        levels = [gains[op] if role == "carrier"
+                  else self.mod_indices[targets[op]] if role == "modulator"
+                  else self.mod_indices[op] * (1 + self.feedback)
+                  for op, role in slots]
         
-        # Normalize to avoid clipping
-        output = output / np.max(np.abs(output))
-        return output
+        notes = [None] * len(freqs)
+        for total_samples in np.unique(lengths):
+            group = np.flatnonzero(lengths == total_samples)
+            envelopes = [self._operator_envelope(op, total_samples) if role == "carrier" else None
+                         for op, role in slots]
+            for start in range(0, len(group), chunk_size):
+                idx = group[start:start + chunk_size]
+                # Each note plays duration * freq cycles over its whole-sample length
+                note_freqs = freqs[idx] * durations[idx] * self.sample_rate / max(total_samples, 1)
+                rendered = fm.render(note_freqs, total_samples, ratios, levels, envelopes,
+                                     sample_rate=self.sample_rate)
+                # Normalize to avoid clipping (this also undoes the carrier averaging)
+                peak = np.max(np.abs(rendered), axis=1, keepdims=True) if total_samples \
+                    else np.ones((len(idx), 1))
+                rendered /= np.where(peak > 0, peak, 1)
+                rendered *= velocities[idx, None]
+                for row, note in enumerate(idx):
+                    notes[note] = rendered[row]
+        return notes
 
 def save_dx7_sound(filename, freq=110, duration=1.0, algorithm=1, sample_rate=44100):
     synth = DX7FMSynth(sample_rate=sample_rate)
@@ -103,4 +162,4 @@ def save_dx7_sound(filename, freq=110, duration=1.0, algorithm=1, sample_rate=44
 if __name__ == "__main__":
     # Test all algorithms
     for algo in range(1, 6):
-        save_dx7_sound(f"dx7_algo{algo}.wav", freq=110, duration=2.0, algorithm=algo)
\ No newline at end of file
+        save_dx7_sound(f"dx7_algo{algo}.wav", freq=110, duration=2.0, algorithm=algo)
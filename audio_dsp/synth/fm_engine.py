@@ -0,0 +1,239 @@
+import numpy as np
+from audio_dsp.kernels import fm_feedback_loop
+
+# The 32 DX7 algorithms with operators numbered 1–6 as on the front panel:
+# (modulation edges as (modulator, target), carriers, feedback edge)
+DX7_ALGORITHMS = {
+    1: ([(2, 1), (4, 3), (5, 4), (6, 5)], [1, 3], (6, 6)),
+    2: ([(2, 1), (4, 3), (5, 4), (6, 5)], [1, 3], (2, 2)),
+    3: ([(2, 1), (3, 2), (5, 4), (6, 5)], [1, 4], (6, 6)),
+    4: ([(2, 1), (3, 2), (5, 4), (6, 5)], [1, 4], (4, 6)),
+    5: ([(2, 1), (4, 3), (6, 5)], [1, 3, 5], (6, 6)),
+    6: ([(2, 1), (4, 3), (6, 5)], [1, 3, 5], (5, 6)),
+    7: ([(2, 1), (4, 3), (5, 3), (6, 5)], [1, 3], (6, 6)),
+    8: ([(2, 1), (4, 3), (5, 3), (6, 5)], [1, 3], (4, 4)),
+    9: ([(2, 1), (4, 3), (5, 3), (6, 5)], [1, 3], (2, 2)),
+    10: ([(2, 1), (3, 2), (5, 4), (6, 4)], [1, 4], (3, 3)),
+    11: ([(2, 1), (3, 2), (5, 4), (6, 4)], [1, 4], (6, 6)),
+    12: ([(2, 1), (4, 3), (5, 3), (6, 3)], [1, 3], (2, 2)),
+    13: ([(2, 1), (4, 3), (5, 3), (6, 3)], [1, 3], (6, 6)),
+    14: ([(2, 1), (4, 3), (5, 4), (6, 4)], [1, 3], (6, 6)),
+    15: ([(2, 1), (4, 3), (5, 4), (6, 4)], [1, 3], (2, 2)),
+    16: ([(2, 1), (3, 1), (4, 3), (5, 1), (6, 5)], [1], (6, 6)),
+    17: ([(2, 1), (3, 1), (4, 3), (5, 1), (6, 5)], [1], (2, 2)),
+    18: ([(2, 1), (3, 1), (4, 1), (5, 4), (6, 5)], [1], (3, 3)),
+    19: ([(2, 1), (3, 2), (6, 4), (6, 5)], [1, 4, 5], (6, 6)),
+    20: ([(3, 1), (3, 2), (5, 4), (6, 4)], [1, 2, 4], (3, 3)),
+    21: ([(3, 1), (3, 2), (6, 4), (6, 5)], [1, 2, 4, 5], (3, 3)),
+    22: ([(2, 1), (6, 3), (6, 4), (6, 5)], [1, 3, 4, 5], (6, 6)),
+    23: ([(3, 2), (6, 4), (6, 5)], [1, 2, 4, 5], (6, 6)),
+    24: ([(6, 3), (6, 4), (6, 5)], [1, 2, 3, 4, 5], (6, 6)),
+    25: ([(6, 4), (6, 5)], [1, 2, 3, 4, 5], (6, 6)),
+    26: ([(3, 2), (5, 4), (6, 4)], [1, 2, 4], (6, 6)),
+    27: ([(3, 2), (5, 4), (6, 4)], [1, 2, 4], (3, 3)),
+    28: ([(2, 1), (4, 3), (5, 4)], [1, 3, 6], (5, 5)),
+    29: ([(4, 3), (6, 5)], [1, 2, 3, 5], (6, 6)),
+    30: ([(4, 3), (5, 4)], [1, 2, 3, 6], (5, 5)),
+    31: ([(6, 5)], [1, 2, 3, 4, 5], (6, 6)),
+    32: ([], [1, 2, 3, 4, 5, 6], (6, 6)),
+}
+
+class FMAlgorithm:
+    """
+    N-operator FM algorithm compiled from a modulation graph.
+
+    Each operator outputs amplitude * sin(phase + modulation), where
+    modulation is the sum of the outputs of the operators feeding it (in
+    radians) and amplitude is its level times its envelope. Carriers are
+    averaged into the output.
+
+    Operators are 0-based indices. edges must be acyclic; loops are
+    declared as feedback edges, which read the source's output one sample
+    late. Operators joined by feedback are evaluated per sample with
+    kernels.fm_feedback_loop, everything else as whole-block array math.
+    """
+
+    def __init__(self, num_operators, edges, carriers, feedback=()):
+        self.num_operators = num_operators
+        self.edges = [tuple(e) for e in edges]
+        self.carriers = list(carriers)
+        self.feedback = [tuple(e) for e in feedback]
+        for src, dst in self.edges + self.feedback:
+            if not (0 <= src < num_operators and 0 <= dst < num_operators):
+                raise ValueError(f"Edge ({src}, {dst}) references a missing operator")
+        if not self.carriers or not all(0 <= c < num_operators for c in self.carriers):
+            raise ValueError("carriers must be one or more operator indices")
+        self.plan = self._compile()
+
+    @classmethod
+    def dx7(cls, number):
+        """One of the 32 DX7 algorithms (6 operators, Op1 = index 0)."""
+        if number not in DX7_ALGORITHMS:
+            raise ValueError("DX7 algorithm must be 1–32")
+        edges, carriers, feedback = DX7_ALGORITHMS[number]
+        return cls(6, [(s - 1, d - 1) for s, d in edges], [c - 1 for c in carriers],
+                   [(feedback[0] - 1, feedback[1] - 1)])
+
+    def _compile(self):
+        """Order operators and feedback groups into an evaluation plan."""
+        n = self.num_operators
+        inputs = [[] for _ in range(n)]
+        for src, dst in self.edges:
+            inputs[dst].append(src)
+
+        # Topological order of the acyclic modulation edges (Kahn)
+        indegree = [len(inputs[k]) for k in range(n)]
+        outputs = [[] for _ in range(n)]
+        for src, dst in self.edges:
+            outputs[src].append(dst)
+        order, ready = [], [k for k in range(n) if indegree[k] == 0]
+        while ready:
+            k = ready.pop(0)
+            order.append(k)
+            for dst in outputs[k]:
+                indegree[dst] -= 1
+                if indegree[dst] == 0:
+                    ready.append(dst)
+        if len(order) != n:
+            raise ValueError("Modulation edges contain a cycle; declare loops as feedback edges")
+        position = {k: i for i, k in enumerate(order)}
+
+        reach = [set() for _ in range(n)]  # reach[k]: operators k modulates, directly or not
+        for k in reversed(order):
+            for dst in outputs[k]:
+                reach[k] |= {dst} | reach[dst]
+
+        # Operators on a feedback path form a group evaluated sample by sample.
+        # Groups are closed so nothing outside sits between two members.
+        groups = []
+        for src, dst in self.feedback:
+            group = {src, dst} | {k for k in range(n) if k in reach[dst] and src in reach[k]}
+            for other in [g for g in groups if g & group]:
+                group |= other
+                groups.remove(other)
+            while True:
+                extra = {k for k in range(n) if k not in group
+                         and any(k in reach[g] for g in group) and any(g in reach[k] for g in group)}
+                if not extra:
+                    break
+                group |= extra
+            groups.append(group)
+        group_of = {k: i for i, g in enumerate(groups) for k in g}
+
+        # Emit steps in topological order of the graph with groups contracted
+        units = [("loop", sorted(g, key=position.get)) for g in groups]
+        units += [("operator", [k]) for k in order if k not in group_of]
+        unit_of = {k: u for u, (_, members) in enumerate(units) for k in members}
+        depends = [set() for _ in units]
+        for src, dst in self.edges:
+            if unit_of[src] != unit_of[dst]:
+                depends[unit_of[dst]].add(unit_of[src])
+        emitted, plan = set(), []
+        while len(emitted) < len(units):
+            unit = min((u for u in range(len(units)) if u not in emitted and depends[u] <= emitted),
+                       key=lambda u: min(position[k] for k in units[u][1]))
+            emitted.add(unit)
+            kind, members = units[unit]
+            local = {k: i for i, k in enumerate(members)}
+            internal = [(local[s], local[d], False) for s, d in self.edges if s in local and d in local]
+            internal += [(local[s], local[d], True) for s, d in self.feedback if s in local and d in local]
+            external = [[s for s in inputs[k] if s not in local] for k in members]
+            plan.append({"kind": kind, "members": members, "internal": internal, "external": external})
+
+        # Free each operator's buffer after the last step that reads it
+        last_use = {}
+        for i, step in enumerate(plan):
+            for k in step["members"]:
+                last_use.setdefault(k, i)
+            for sources in step["external"]:
+                for s in sources:
+                    last_use[s] = i
+        for i, step in enumerate(plan):
+            step["release"] = [k for k, last in last_use.items() if last == i]
+        return plan
+
+    def render(self, freqs, num_samples, ratios, levels=None, envelopes=None, feedback=0.0,
+               sample_rate=44100, block_size=4096):
+        """
+        Render one or more notes through the algorithm.
+        - freqs: Note frequencies in Hz (scalar or one per note)
+        - num_samples: Length of every note in samples
+        - ratios: Frequency ratio per operator
+        - levels: Output level per operator; for modulators this is the
+          modulation index in radians (default 1.0)
+        - envelopes: Per-operator envelope arrays of num_samples (or
+          notes x num_samples), or None for a constant 1.0
+        - feedback: Feedback depth for every feedback edge, or one per edge
+        - block_size: Samples rendered per block; bounds memory
+        Returns a (notes, num_samples) array.
+        """
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        notes = len(freqs)
+        levels = np.broadcast_to(np.asarray(1.0 if levels is None else levels, dtype=np.float64),
+                                 (self.num_operators,))
+        envelopes = [None] * self.num_operators if envelopes is None else list(envelopes)
+        feedback = np.broadcast_to(np.asarray(feedback, dtype=np.float64), (len(self.feedback),))
+        fb_weight = dict(zip(self.feedback, feedback))
+        rates = np.outer(freqs / sample_rate, np.asarray(ratios, dtype=np.float64))  # Cycles per sample
+
+        output = np.zeros((notes, num_samples))
+        states = [np.zeros((len(step["members"]), notes, 2)) for step in self.plan]
+        pool = []
+        for start in range(0, num_samples, block_size):
+            index = np.arange(start, min(start + block_size, num_samples))
+            width = len(index)
+            buffers = {}
+
+            def phase(k):
+                cycles = np.outer(rates[:, k], index)
+                cycles -= np.floor(cycles)
+                return cycles * (2 * np.pi)
+
+            def amplitude(k):
+                env = envelopes[k]
+                if env is None:
+                    return np.full((notes, width), levels[k])
+                return levels[k] * np.broadcast_to(np.asarray(env)[..., start:start + width], (notes, width))
+
+            def take():
+                buf = pool.pop() if pool else np.empty((notes, block_size))
+                return buf[:, :width]
+
+            for step, state in zip(self.plan, states):
+                members = step["members"]
+                externals = []
+                for sources in step["external"]:
+                    mod = np.zeros((notes, width))
+                    for s in sources:
+                        mod += buffers[s]
+                    externals.append(mod)
+                weights = [fb_weight[(members[s], members[d])] if delayed else 1.0
+                           for s, d, delayed in step["internal"]]
+                if step["kind"] == "operator" or not any(w for w, e in zip(weights, step["internal"]) if e[2]):
+                    # No live feedback: evaluate members in order as whole blocks
+                    for j, k in enumerate(members):
+                        mod = externals[j]
+                        for (s, d, delayed), w in zip(step["internal"], weights):
+                            if d == j and not delayed:
+                                mod += buffers[members[s]]
+                        buf = take()
+                        np.sin(phase(k) + mod, out=buf)
+                        buf *= amplitude(k)
+                        buffers[k] = buf
+                else:
+                    out = fm_feedback_loop(np.stack([phase(k) for k in members]),
+                                           np.stack([amplitude(k) for k in members]),
+                                           np.stack(externals),
+                                           [(s, d, w, delayed) for (s, d, delayed), w in
+                                            zip(step["internal"], weights)], state)
+                    for j, k in enumerate(members):
+                        buf = take()
+                        buf[...] = out[j]
+                        buffers[k] = buf
+                for k in members:
+                    if k in self.carriers:
+                        output[:, start:start + width] += buffers[k]
+                for k in step["release"]:
+                    pool.append(buffers.pop(k).base)
+
+        return output / len(self.carriers)
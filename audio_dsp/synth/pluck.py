@@ -51,6 +51,7 @@
 
 import numpy as np
 from audio_dsp.utils import wav_io as wavfile
+from audio_dsp.kernels import karplus_strong_loop
 
 SAMPLE_RATE = 44100
 
@@ -59,14 +60,8 @@ def save_wav(file_path, data):
     wavfile.write(file_path, SAMPLE_RATE, (data * 32767).astype(np.int16))
     print(f"Saved to {file_path}")
 
-def karplus_strong(length, frequency, intensity, damping=0.5, brightness=0.5, 
-                   mute_strength=0.5, pitch_bend=0.5, pluck_position=0.5, plectrum_size=0.5):
-    """Generate a plucked string sound with plectrum size control."""
-    # Calculate buffer size and total samples
-    period = int(SAMPLE_RATE / frequency)
-    total_samples = int(length * SAMPLE_RATE)
-    output = np.zeros(total_samples, dtype=np.float32)
-    
+def _pluck_excitation(period, total_samples, intensity, pluck_position, plectrum_size):
+    """Noise burst for one string, shaped by pluck position and plectrum size."""
     # Plectrum size affects noise duration and amplitude
     pluck_duration = int(period * (0.5 + plectrum_size * 0.5))  # 50% to 100% of period
     pluck_duration = min(pluck_duration, total_samples)  # Cap at signal length
@@ -82,41 +77,67 @@ def karplus_strong(length, frequency, intensity, damping=0.5, brightness=0.5,
     # Apply plectrum duration
     if pluck_duration < period:
         buffer[pluck_duration:] = 0  # Zero out beyond plectrum duration
-    
-    if period > total_samples:
-        output[:total_samples] = buffer[:total_samples]
-        return output
-    else:
-        output[:period] = buffer
+    return buffer
+
+def karplus_strong_batch(frequencies, lengths, intensity=1.0, damping=0.5, brightness=0.5, 
+                         mute_strength=0.5, pitch_bend=0.5, pluck_position=0.5, plectrum_size=0.5):
+    """
+    Render many plucked strings at once.
+    
+    frequencies and lengths (seconds) give one entry per string; every other
+    parameter is a scalar or a per-string array. Strings with the same
+    delay-line period are run through the feedback loop together.
+    
+    Returns a float32 array of shape (strings, max_samples). Each row is
+    zero after its own length.
+    """
+    (frequencies, lengths, intensity, damping, brightness, 
+     mute_strength, pitch_bend, pluck_position, plectrum_size) = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in 
+          (frequencies, lengths, intensity, damping, brightness, 
+           mute_strength, pitch_bend, pluck_position, plectrum_size)])
+    periods = (SAMPLE_RATE / frequencies).astype(np.int64)
+    totals = (lengths * SAMPLE_RATE).astype(np.int64)
+    output = np.zeros((len(periods), totals.max() if len(totals) else 0), dtype=np.float32)
+    
+    for row, (period, total) in enumerate(zip(periods, totals)):
+        buffer = _pluck_excitation(period, total, intensity[row], pluck_position[row], plectrum_size[row])
+        output[row, :min(period, total)] = buffer[:total]
     
     # Map parameters
     decay = 0.99 + (1 - damping) * 0.009
     filter_weight = brightness * (1 - pluck_position * 0.5)
-    
-    # Pitch bend
-    t = np.linspace(0, length, total_samples, endpoint=False)
+    mute_slope = mute_strength / np.maximum(totals - 1, 1)  # Mute ramps 0 -> mute_strength
     bend_amount = pitch_bend * 0.5
     pitch_factor = 2 ** (bend_amount / 12)
-    freq_mod = frequency * (1 + (pitch_factor - 1) * np.exp(-5 * t))
-    
-    # Mute envelope
-    mute_factor = mute_strength * np.linspace(0, 1, total_samples)
     
-    # Karplus-Strong loop
-    for i in range(period, total_samples):
-        prev_sample = output[i - period]
-        prev_prev_sample = output[i - period - 1]
-        filtered = filter_weight * prev_sample + (1 - filter_weight) * prev_prev_sample
-        mute_weight = 1 - mute_factor[i]
-        filtered = mute_weight * filtered + (1 - mute_weight) * 0.5 * (prev_sample + prev_prev_sample)
-        output[i] = decay * filtered
+    # Strings shorter than one period keep the raw excitation
+    plucked = periods <= totals
+    for period in np.unique(periods[plucked]):
+        rows = np.flatnonzero(plucked & (periods == period))
+        width = totals[rows].max()
+        block = output[rows, :width]
+        
+        # Karplus-Strong loop
+        karplus_strong_loop(block, period, filter_weight[rows], mute_slope[rows], 
+                            decay[rows], totals[rows])
+        output[rows, :width] = block
     
     # Apply pitch modulation
-    phase = 2 * np.pi * freq_mod * t
-    output = output * np.sin(phase)
+    for row in np.flatnonzero(plucked):
+        total = totals[row]
+        t = np.linspace(0, lengths[row], total, endpoint=False)
+        freq_mod = frequencies[row] * (1 + (pitch_factor[row] - 1) * np.exp(-5 * t))
+        output[row, :total] *= np.sin(2 * np.pi * freq_mod * t)
     
     return output
 
+def karplus_strong(length, frequency, intensity, damping=0.5, brightness=0.5, 
+                   mute_strength=0.5, pitch_bend=0.5, pluck_position=0.5, plectrum_size=0.5):
+    """Generate a plucked string sound with plectrum size control."""
+    return karplus_strong_batch(frequency, length, intensity, damping, brightness, 
+                                mute_strength, pitch_bend, pluck_position, plectrum_size)[0]
+
 def generate_string_pluck(output_file, length=2.0, frequency=440.0, intensity=1.0, 
                          damping=0.5, brightness=0.5, mute_strength=0.5, 
                          pitch_bend=0.5, pluck_position=0.5, plectrum_size=0.5):
@@ -1,5 +1,7 @@
 import numpy as np
 import soundfile as sf
+from audio_dsp.kernels import ladder_filter, ladder_coefficients, LADDER_LOWPASS, LADDER_HIGHPASS, LADDER_BANDPASS
+from audio_dsp.synth.oscillators import phase_accumulator, blep_saw, blep_pulse, blep_triangle, Wavetable
 
 class SubtractiveSynth:
     def __init__(self, sample_rate=44100):
@@ -16,6 +18,7 @@ class SubtractiveSynth:
         self.filter_cutoff = 1000  # Hz
         self.filter_resonance = 0.7  # Resonance amplitude (0–5)
         self.filter_q = 1.0  # Q factor (0.1–10)
+        self.filter_control_rate = None  # Coefficient update interval in samples (None = every sample)
 
         # Default LFOs
         self.lfo_freq = 5
@@ -25,10 +28,22 @@ class SubtractiveSynth:
         # Default waveform
         self.osc_wave = "saw"
         self.pwm_depth = 0.5
-        self.wavetable = None
+        self.wavetable = None  # Single-cycle array, (frames, samples) array or Wavetable
+        self.wavetable_position = 0.0  # Frame morph position 0–1 (scalar or per-sample)
+        self.band_limited = False  # True: PolyBLEP saw/square/triangle/pwm and mipmapped wavetables
 
     def generate_waveform(self, wave_type, freq, duration):
         t = np.linspace(0, duration, int(self.sample_rate * duration), endpoint=False)
+        if self.band_limited and wave_type in ("saw", "square", "triangle", "pwm"):
+            phase, dt = phase_accumulator(freq, len(t), self.sample_rate)
+            if wave_type == "saw":
+                return blep_saw(phase, dt)
+            elif wave_type == "square":
+                return blep_pulse(phase, dt)
+            elif wave_type == "triangle":
+                return blep_triangle(phase, dt)
+            duty_cycle = 0.5 + self.pwm_depth * np.sin(2 * np.pi * phase)
+            return blep_pulse(phase, dt, duty_cycle)
         if wave_type == "sine":
             return np.sin(2 * np.pi * freq * t)
         elif wave_type == "square":
@@ -41,9 +56,14 @@ class SubtractiveSynth:
             duty_cycle = 0.5 + self.pwm_depth * np.sin(2 * np.pi * freq * t)
             return np.where((t * freq) % 1 < duty_cycle, 1, -1)
         elif wave_type == "wavetable" and self.wavetable is not None:
-            wavetable_size = len(self.wavetable)
-            indices = (t * freq * wavetable_size) % wavetable_size
-            return np.interp(indices, np.arange(wavetable_size), self.wavetable)
+            if not self.band_limited and np.ndim(self.wavetable) == 1:
+                wavetable_size = len(self.wavetable)
+                indices = (t * freq * wavetable_size) % wavetable_size
+                return np.interp(indices, np.arange(wavetable_size), self.wavetable)
+            wavetable = self.wavetable
+            if not isinstance(wavetable, Wavetable):
+                wavetable = Wavetable(wavetable, self.sample_rate)  # Mipmaps are cached by content
+            return wavetable.render(freq, len(t), self.wavetable_position)
         else:
             raise ValueError("Invalid waveform type.")
 
@@ -90,14 +110,17 @@ class SubtractiveSynth:
 
         return signal * envelope
 
-    def apply_filter(self, signal, cutoff, resonance, q, filter_type="lowpass"):
+    def apply_filter(self, signal, cutoff, resonance, q, filter_type="lowpass", control_rate=None):
         """
         Enhanced 4-pole resonant filter with adjustable Q and type.
         - signal: Input audio array
-        - cutoff: Array of cutoff frequencies in Hz (50–5000)
+        - cutoff: Cutoff in Hz, scalar or per-sample array (50–5000)
         - resonance: Resonance amplitude (0–5)
         - q: Q factor (0.1–10)
         - filter_type: 'lowpass', 'highpass', 'bandpass'
+        - control_rate: Recompute coefficients every N samples (e.g. 32) and
+          interpolate in between; None updates every sample. A constant
+          cutoff is always computed once.
         """
         nyquist = self.sample_rate / 2
         cutoff = np.clip(cutoff, 50, nyquist - 1)
@@ -105,42 +128,11 @@ class SubtractiveSynth:
         q = np.clip(q, 0.1, 10.0)
         
         res_amplitude = resonance * 0.25 * (1 + np.exp(0.5 * resonance))
-        y0, y1, y2, y3 = 0.0, 0.0, 0.0, 0.0
-        output = np.zeros_like(signal)
-        
-        for i in range(len(signal)):
-            wc = 2 * np.pi * cutoff[i] / self.sample_rate
-            alpha = np.sin(wc) / q
-            input_sample = signal[i]
-            
-            if filter_type == "lowpass":
-                feedback = res_amplitude * y3
-                y0 = np.tanh(y0 + alpha * (input_sample - feedback - y0))
-                y1 = np.tanh(y1 + alpha * (y0 - y1))
-                y2 = np.tanh(y2 + alpha * (y1 - y2))
-                y3 = np.tanh(y3 + alpha * (y2 - y3))
-                y3 *= 0.98
-                output[i] = y3
-            
-            elif filter_type == "highpass":
-                # High-pass: Differential ladder
-                feedback = res_amplitude * y3
-                diff = input_sample - y0  # Differentiate input
-                y0 = np.tanh(diff + alpha * (input_sample - y0 - feedback))
-                y1 = np.tanh(y1 + alpha * (y0 - y1))
-                y2 = np.tanh(y2 + alpha * (y1 - y2))
-                y3 = np.tanh(y3 + alpha * (y2 - y3))
-                y3 *= 0.98
-                output[i] = y0 * 2.0  # Boost highs
-            
-            elif filter_type == "bandpass":
-                feedback = res_amplitude * y3
-                y0 = np.tanh(y0 + alpha * (input_sample - feedback - y0))
-                y1 = np.tanh(y1 + alpha * (y0 - y1))
-                y2 = np.tanh(y2 + alpha * (y1 - y2))
-                y3 = np.tanh(y3 + alpha * (y2 - y3))
-                y3 *= 0.98
-                output[i] = y2 - y3
+        modes = {"lowpass": LADDER_LOWPASS, "highpass": LADDER_HIGHPASS, "bandpass": LADDER_BANDPASS}
+        if filter_type not in modes:
+            raise ValueError("Invalid filter type.")
+        alpha = ladder_coefficients(cutoff, q, self.sample_rate, control_rate)
+        output = ladder_filter(signal, alpha, res_amplitude, modes[filter_type])
         
         output = np.tanh(output)  # Final clip
         return output
@@ -160,7 +152,7 @@ class SubtractiveSynth:
             cutoff_modulated = self.filter_cutoff * (1 + lfo)
             cutoff_modulated = np.clip(cutoff_modulated, 20, self.sample_rate / 2)
             signal = self.apply_filter(signal, cutoff_modulated, self.filter_resonance, 
-                                     self.filter_q, self.filter_type)
+                                     self.filter_q, self.filter_type, self.filter_control_rate)
         elif self.lfo_target == "pitch":
             freq_modulated = freq * (1 + lfo)
             signal = np.interp(t, t, self.generate_waveform(self.osc_wave, freq_modulated, duration))
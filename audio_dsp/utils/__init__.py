@@ -4,13 +4,23 @@ Utility functions for audio processing.
 Core utilities (no optional dependencies):
     from audio_dsp.utils import generate_maqam_frequencies, white_noise
     from audio_dsp.utils import load_audio, save_audio, normalize_audio, resample_audio
+    from audio_dsp.utils import AudioCache, Resampler, load_directory
 
 Utilities requiring optional dependencies:
     from audio_dsp.utils import SpectralAnalyzer  # requires librosa
     from audio_dsp.utils import image_to_rhythmic_audio  # requires PIL, cv2
 """
 
-from .audio_io import load_audio, save_audio, normalize_audio, resample_audio
+from .audio_io import (
+    load_audio,
+    save_audio,
+    normalize_audio,
+    resample_audio,
+    load_files,
+    load_directory,
+    Resampler,
+    AudioCache,
+)
 from .maqamat import generate_maqam_frequencies
 from .scales_and_melody import (
     categorise_interval,
@@ -43,6 +53,10 @@ __all__ = [
     "save_audio",
     "normalize_audio",
     "resample_audio",
+    "load_files",
+    "load_directory",
+    "Resampler",
+    "AudioCache",
     "generate_maqam_frequencies",
     "categorise_interval",
     "generate_scale",
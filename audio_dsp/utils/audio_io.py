@@ -5,12 +5,88 @@ Uses scipy.io.wavfile as the lightweight backend for WAV file operations.
 """
 
 import numpy as np
+import os
+import hashlib
+import tempfile
+import fnmatch
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from audio_dsp.utils import wav_io as wavfile
-from scipy.signal import resample_poly
+from scipy.signal import resample_poly, firwin
 from math import gcd
 
 
-def load_audio(audio_input, sr=None, mono=True):
+class MappedAudio:
+    """
+    Lazy float32 view over a memory-mapped WAV file.
+
+    Nothing is decoded up front: indexing along the frame axis reads only
+    the requested frames from disk and converts them to float32 (and to
+    mono, if requested). np.asarray() on the whole object decodes everything.
+
+    Returned by load_audio(..., mmap=True).
+    """
+
+    def __init__(self, frames, bits_per_sample, mono=True):
+        self._frames = frames
+        self._bits_per_sample = bits_per_sample
+        self._channels = frames.shape[1] // 3 if bits_per_sample == 24 else frames.shape[1]
+        self.mono = mono
+
+    @property
+    def channels(self):
+        """Number of channels returned by indexing."""
+        return 1 if self.mono else self._channels
+
+    @property
+    def shape(self):
+        if self.channels == 1:
+            return (len(self._frames),)
+        return (len(self._frames), self._channels)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            frame_key, channel_key = key[0], key[1:]
+        else:
+            frame_key, channel_key = key, ()
+
+        raw = self._frames[frame_key]
+        if self._bits_per_sample == 24:
+            single = raw.ndim == 1
+            raw = wavfile._pcm24_to_int32(np.ascontiguousarray(np.atleast_2d(raw)).tobytes())
+            raw = raw.reshape(-1, self._channels)
+            if single:
+                raw = raw[0]
+        audio = wavfile._to_float32(raw)
+
+        if self._channels == 1:
+            audio = audio[..., 0]
+        elif self.mono:
+            audio = np.mean(audio, axis=-1, dtype=np.float32)
+        return audio[(Ellipsis,) + channel_key] if channel_key else audio
+
+    def __array__(self, dtype=None, copy=None):
+        audio = self[:]
+        return audio if dtype is None else audio.astype(dtype)
+
+    def __repr__(self):
+        return f"MappedAudio(shape={self.shape}, bits_per_sample={self._bits_per_sample})"
+
+
+def load_audio(audio_input, sr=None, mono=True, mmap=False, start=0, stop=None):
     """
     Load audio from a file path or pass through a numpy array.
 
@@ -18,10 +94,16 @@ def load_audio(audio_input, sr=None, mono=True):
     - audio_input: File path (str) or numpy array
     - sr: Sample rate (required if audio_input is an array, ignored if loading from file)
     - mono: Convert to mono if True (default True)
+    - mmap: If True and audio_input is a file path, memory-map the file and
+      return a MappedAudio that decodes to float32 per slice (default False)
+    - start: First frame to load (default 0)
+    - stop: Frame to stop before (default None = end). For files only the
+      requested span is read and decoded.
 
     Returns:
     - sr: Sample rate
     - audio: Audio data as float32 numpy array normalized to [-1, 1]
+      (a MappedAudio when mmap=True)
 
     Note: Return order matches wavfile.read() convention: (sample_rate, data)
 
@@ -30,26 +112,15 @@ def load_audio(audio_input, sr=None, mono=True):
     - TypeError: If audio_input is neither a string nor a numpy array
     """
     if isinstance(audio_input, str):
+        if mmap:
+            file_sr, frames, bits_per_sample = wavfile._map_frames(audio_input)
+            return file_sr, MappedAudio(frames[start:stop], bits_per_sample, mono=mono)
+
         # Load from file
-        file_sr, data = wavfile.read(audio_input)
+        file_sr, data = wavfile.read(audio_input, start=start, stop=stop)
 
         # Convert to float32 normalized to [-1, 1]
-        if data.dtype == np.int16:
-            audio = data.astype(np.float32) / 32768.0
-        elif data.dtype == np.int32:
-            audio = data.astype(np.float32) / 2147483648.0
-        elif data.dtype == np.float32:
-            audio = data
-        elif data.dtype == np.float64:
-            audio = data.astype(np.float32)
-        elif data.dtype == np.uint8:
-            audio = (data.astype(np.float32) - 128) / 128.0
-        else:
-            # Fallback for other dtypes
-            audio = data.astype(np.float32)
-            max_val = np.max(np.abs(audio))
-            if max_val > 0:
-                audio = audio / max_val
+        audio = wavfile._to_float32(data)
 
         # Convert to mono if needed
         if mono and audio.ndim > 1:
@@ -61,7 +132,7 @@ def load_audio(audio_input, sr=None, mono=True):
         if sr is None:
             raise ValueError("sr (sample rate) is required when audio_input is an array")
 
-        audio = audio_input.astype(np.float32)
+        audio = audio_input[start:stop].astype(np.float32)
 
         # Convert to mono if needed
         if mono and audio.ndim > 1:
@@ -88,8 +159,10 @@ def save_audio(file_path, audio, sr, bit_depth=16):
     if bit_depth == 16:
         audio_int = (audio * 32767).astype(np.int16)
     elif bit_depth == 24:
-        # scipy.io.wavfile doesn't support 24-bit, use 32-bit float instead
-        audio_int = audio.astype(np.float32)
+        # Scale to the 24-bit range, then left-justify into int32 for packing
+        audio_int = np.round(audio * 8388607).astype(np.int32) << 8
+        wavfile.write(file_path, sr, audio_int, bit_depth=24)
+        return
     else:
         audio_int = (audio * 32767).astype(np.int16)
 
@@ -118,7 +191,7 @@ def resample_audio(audio, orig_sr, target_sr):
     Resample audio from one sample rate to another.
 
     Parameters:
-    - audio: Audio data as numpy array
+    - audio: Audio data as numpy array (resampled along axis 0)
     - orig_sr: Original sample rate
     - target_sr: Target sample rate
 
@@ -128,9 +201,410 @@ def resample_audio(audio, orig_sr, target_sr):
     if orig_sr == target_sr:
         return audio
 
-    # Find GCD to simplify the ratio
-    g = gcd(int(orig_sr), int(target_sr))
-    up = int(target_sr) // g
-    down = int(orig_sr) // g
+    return Resampler(orig_sr, target_sr).resample(audio)
+
+
+def load_files(paths, sr=None, mono=True, workers=None, cache=None, skip_errors=False):
+    """
+    Load many audio files concurrently.
+
+    Decoding (np.frombuffer) and resampling (resample_poly) release the GIL,
+    so a thread pool gives a near-linear speedup on multi-core machines.
+
+    Parameters:
+    - paths: Iterable of WAV file paths
+    - sr: Target sample rate (default None = keep each file's own rate)
+    - mono: Convert to mono if True (default True)
+    - workers: Number of threads (default None = ThreadPoolExecutor default)
+    - cache: Optional AudioCache to load through
+    - skip_errors: If True, print and skip files that fail to load instead
+      of raising (default False)
+
+    Returns:
+    - dict mapping each path to its float32 audio array, in input order
+    """
+    paths = list(paths)
+
+    def _load(path):
+        if cache is not None:
+            return cache.load(path, sr=sr, mono=mono)[1]
+        file_sr, audio = load_audio(path, mono=mono)
+        if sr is not None:
+            audio = resample_audio(audio, file_sr, sr)
+        return audio
+
+    def _try_load(path):
+        try:
+            return _load(path)
+        except Exception as e:
+            if not skip_errors:
+                raise
+            print(f"Error loading {path}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_try_load, paths))
+
+    return {path: audio for path, audio in zip(paths, results) if audio is not None}
+
+
+def load_directory(path, pattern="*.wav", sr=None, mono=True, workers=None, cache=None,
+                   skip_errors=False):
+    """
+    Load every matching audio file in a directory concurrently.
+
+    Parameters:
+    - path: Directory to scan (not recursive)
+    - pattern: Case-insensitive glob pattern for file names (default "*.wav")
+    - sr: Target sample rate (default None = keep each file's own rate)
+    - mono: Convert to mono if True (default True)
+    - workers: Number of threads (default None = ThreadPoolExecutor default)
+    - cache: Optional AudioCache to load through
+    - skip_errors: If True, print and skip files that fail to load instead
+      of raising (default False)
+
+    Returns:
+    - dict mapping file name (e.g. "kick.wav") to float32 audio array,
+      sorted by file name
+    """
+    names = sorted(
+        name for name in os.listdir(path)
+        if fnmatch.fnmatch(name.lower(), pattern.lower())
+        and os.path.isfile(os.path.join(path, name))
+    )
+    loaded = load_files([os.path.join(path, name) for name in names], sr=sr, mono=mono,
+                        workers=workers, cache=cache, skip_errors=skip_errors)
+    return {os.path.basename(file_path): audio for file_path, audio in loaded.items()}
+
+
+@lru_cache(maxsize=64)
+def _design_filter(up, down, quality):
+    """
+    Design (once per ratio) the anti-aliasing FIR used by Resampler.
+
+    Matches scipy.signal.resample_poly's default design: a Kaiser-windowed
+    sinc (beta 5.0) with `quality` zero crossings per side.
+
+    Returns:
+    - (taps, polyphase): read-only FIR taps, and the same taps scaled by `up`
+      and split into `up` phases of equal length (row p holds h[p::up])
+    """
+    max_rate = max(up, down)
+    if max_rate == 1:
+        taps = np.ones(1)  # Identity ratio, no filtering needed
+    else:
+        half_len = quality * max_rate
+        taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+    taps.setflags(write=False)
+
+    phase_len = -(-len(taps) // up)
+    padded = np.zeros(phase_len * up)
+    padded[:len(taps)] = taps * up
+    polyphase = padded.reshape(phase_len, up).T.copy()
+    polyphase.setflags(write=False)
+    return taps, polyphase
+
+
+class Resampler:
+    """
+    Rational-ratio polyphase resampler.
+
+    The anti-aliasing filter is designed once per (up, down, quality) and
+    shared by all instances. resample() converts a whole signal and gives the
+    same result as scipy.signal.resample_poly. process()/flush() convert a
+    stream block by block, keeping the filter history between calls, and
+    produce the same samples as resample() on the concatenated input.
+
+    Example:
+        rs = Resampler(44100, 48000)
+        out = [rs.process(block) for block in blocks] + [rs.flush()]
+    """
+
+    # Outputs computed per vectorized gather in process() (bounds memory)
+    _chunk = 8192
+
+    def __init__(self, orig_sr, target_sr, quality=10):
+        """
+        Parameters:
+        - orig_sr: Input sample rate
+        - target_sr: Output sample rate
+        - quality: Filter half-length in zero crossings (default 10, as in
+          resample_poly; lower is faster, higher is steeper)
+        """
+        self.orig_sr = int(orig_sr)
+        self.target_sr = int(target_sr)
+        self.quality = int(quality)
+
+        g = gcd(self.orig_sr, self.target_sr)
+        self.up = self.target_sr // g
+        self.down = self.orig_sr // g
+        self._taps, self._polyphase = _design_filter(self.up, self.down, self.quality)
+        self._half_len = (len(self._taps) - 1) // 2
+        self.reset()
+
+    def reset(self):
+        """Clear the streaming state."""
+        self._buffer = None
+        self._frame_shape = ()
+        self._base = 0       # Input index of self._buffer[0]
+        self._n_in = 0       # Input samples consumed
+        self._n_out = 0      # Output samples produced
+
+    def resample(self, audio):
+        """
+        Resample a complete signal (stateless).
+
+        Parameters:
+        - audio: Array of shape (N,) or (N, channels)
+
+        Returns:
+        - float32 array of shape (ceil(N * up / down),) or (..., channels)
+        """
+        if self.up == self.down:
+            return np.asarray(audio)
+        return resample_poly(audio, self.up, self.down, axis=0,
+                             window=self._taps).astype(np.float32)
+
+    def _input_index(self, m):
+        """Newest input sample that output m depends on."""
+        return (m * self.down + self._half_len) // self.up
+
+    def _render(self, stop):
+        """Compute outputs self._n_out .. stop-1 from the buffered input."""
+        phase_len = self._polyphase.shape[1]
+        taps_back = np.arange(phase_len)
+        blocks = []
+        for start in range(self._n_out, stop, self._chunk):
+            m = np.arange(start, min(start + self._chunk, stop))
+            n = m * self.down + self._half_len
+            newest = n // self.up - self._base
+            idx = newest[:, None] - taps_back[None, :]
+            weights = self._polyphase[n % self.up]
+            blocks.append(np.einsum('mt,mt...->m...', weights, self._buffer[idx]))
+        self._n_out = max(stop, self._n_out)
+        if not blocks:
+            return np.zeros((0,) + self._buffer.shape[1:], dtype=np.float32)
+        return np.concatenate(blocks).astype(np.float32)
+
+    def _trim(self):
+        """Drop input samples no future output depends on."""
+        oldest = self._input_index(self._n_out) - (self._polyphase.shape[1] - 1)
+        drop = oldest - self._base
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._base += drop
+
+    def process(self, block):
+        """
+        Resample the next block of a stream.
+
+        Parameters:
+        - block: Array of shape (N,) or (N, channels); the channel layout
+          must stay the same for the whole stream
+
+        Returns:
+        - float32 array of every output sample that is fully determined by
+          the input so far (the filter delay is released by flush())
+        """
+        block = np.asarray(block, dtype=np.float64)
+        self._frame_shape = block.shape[1:]
+        if self.up == self.down:
+            self._n_in += len(block)
+            self._n_out += len(block)
+            return block.astype(np.float32)
+
+        if self._buffer is None:
+            # Zero history so the first outputs see silence before the signal
+            history = self._polyphase.shape[1] - 1
+            self._buffer = np.zeros((history,) + block.shape[1:])
+            self._base = -history
+        self._buffer = np.concatenate([self._buffer, block])
+        self._n_in += len(block)
+
+        # Outputs whose newest input sample has arrived
+        stop = (self._n_in * self.up - 1 - self._half_len) // self.down + 1
+        out = self._render(max(stop, self._n_out))
+        self._trim()
+        return out
+
+    def flush(self):
+        """
+        Finish the stream and return the remaining output samples.
+
+        The total output length equals that of resample() on the whole
+        input. The resampler is reset afterwards and can be reused.
+        """
+        if self._buffer is None or self.up == self.down:
+            empty = np.zeros((0,) + self._frame_shape, dtype=np.float32)
+            self.reset()
+            return empty
+
+        total = -(-self._n_in * self.up // self.down)
+        needed = self._input_index(total - 1) - self._base + 1
+        if needed > len(self._buffer):
+            pad = np.zeros((needed - len(self._buffer),) + self._buffer.shape[1:])
+            self._buffer = np.concatenate([self._buffer, pad])
+        out = self._render(total)
+        self.reset()
+        return out
+
+
+class AudioCache:
+    """
+    Opt-in on-disk cache of decoded audio.
+
+    Decoded, optionally mono-mixed and resampled float32 arrays are stored as
+    .npy files under cache_dir and loaded back memory-mapped, so repeated
+    loads of the same sample library skip decoding and resampling.
+
+    Entries are keyed by the file's absolute path, size and modification
+    time (or by a hash of its contents with content_hash=True), the target
+    sample rate and the mono flag. When the cache grows past max_bytes the
+    least recently used entries are deleted.
+
+    One instance can be shared between threads (load_files does this): the
+    index, eviction and loading of entries are guarded by a lock, while
+    decoding and resampling run outside it.
+
+    Example:
+        cache = AudioCache("~/.cache/audio_dsp", max_bytes=2 * 1024**3)
+        sr, audio = cache.load("kick.wav", sr=44100)
+        print(cache.stats())
+    """
+
+    def __init__(self, cache_dir, max_bytes=1024 ** 3, content_hash=False):
+        """
+        Parameters:
+        - cache_dir: Directory holding the .npy entries (created if missing)
+        - max_bytes: Size bound for all entries together (default 1 GiB)
+        - content_hash: Key on a SHA-1 of the file contents instead of
+          path/size/mtime (slower, but survives moves and touch)
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.content_hash = content_hash
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # LRU index of existing entries, oldest first (mtime = last use)
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npy"):
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, name, st.st_size))
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self._total_bytes = sum(self._entries.values())
+
+    def _key(self, file_path, sr, mono):
+        """Build the cache file name for a source file and load options."""
+        h = hashlib.sha1()
+        if self.content_hash:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        else:
+            st = os.stat(file_path)
+            h.update(f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}".encode())
+        h.update(f"|{sr}|{bool(mono)}".encode())
+        return h.hexdigest() + ".npy"
+
+    def load(self, file_path, sr=None, mono=True):
+        """
+        Load a file through the cache.
+
+        Parameters:
+        - file_path: Path to a WAV file
+        - sr: Target sample rate (default None = keep the file's rate)
+        - mono: Mix down to mono if True (default True)
+
+        Returns:
+        - sr: Sample rate of the returned audio
+        - audio: Read-only float32 array (memory-mapped from the cache)
+        """
+        file_sr = wavfile.info(file_path).rate
+        target_sr = file_sr if sr is None else int(sr)
+        name = self._key(file_path, target_sr, mono)
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            if name in self._entries and os.path.exists(path):
+                self.hits += 1
+                self._entries.move_to_end(name)
+                os.utime(path)  # Record use for LRU across sessions
+                return target_sr, np.load(path, mmap_mode="r")
+            self.misses += 1
+
+        _, audio = load_audio(file_path, mono=mono)
+        audio = resample_audio(audio, file_sr, target_sr).astype(np.float32, copy=False)
+
+        # Write atomically so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, audio)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            try:
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            size = os.path.getsize(path)
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            # Map the new entry before evicting, and never evict it
+            mapped = np.load(path, mmap_mode="r")
+            self._evict(keep=name)
+        return target_sr, mapped
+
+    def _evict(self, keep=None):
+        """
+        Delete least recently used entries until under max_bytes, never
+        the entry named keep. The caller must hold the lock.
+        """
+        for name in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self._total_bytes -= self._entries.pop(name)
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass  # Already gone, or still mapped on a platform that forbids removal
+
+    def clear(self):
+        """Delete all cache entries and reset the counters."""
+        with self._lock:
+            for name in list(self._entries):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return cache counters.
 
-    return resample_poly(audio, up, down).astype(np.float32)
+        Returns:
+        - dict with hits, misses, evictions, entries and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
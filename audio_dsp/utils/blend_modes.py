@@ -16,9 +16,18 @@ def save_wav(file_path, sample_rate, data):
     wav.write(file_path, sample_rate, data)
 
 def blend_audio(top_layer, bottom_layer, mode):
-    """Blend two audio signals using various blend modes."""
+    """Blend two audio signals using various blend modes.
+
+    Layers may be mono (frames,) or multichannel (frames, channels); a mono
+    layer is applied to every channel of a multichannel one.
+    """
+    top_layer, bottom_layer = np.asarray(top_layer), np.asarray(bottom_layer)
     min_length = min(len(top_layer), len(bottom_layer))
     top_layer, bottom_layer = top_layer[:min_length], bottom_layer[:min_length]
+    if top_layer.ndim == 1 and bottom_layer.ndim > 1:
+        top_layer = top_layer[:, None]
+    elif bottom_layer.ndim == 1 and top_layer.ndim > 1:
+        bottom_layer = bottom_layer[:, None]
     
     if mode == "add":
         result = top_layer + bottom_layer
@@ -14,8 +14,8 @@ class SpectralAnalyzer:
         - output_file: Output .spectral file path
         - num_peaks: Number of spectral peaks to extract
         """
-        # Load WAV file
-        sr, audio = load_audio(wav_file, mono=True)
+        # Load WAV file (only the frames the FFT uses)
+        sr, audio = load_audio(wav_file, mono=True, stop=self.fft_size)
         if len(audio) < self.fft_size:
             audio = np.pad(audio, (0, self.fft_size - len(audio)), 'constant')
 
@@ -3,20 +3,31 @@ Drop-in replacement for scipy.io.wavfile.
 
 Supports reading and writing WAV files with proper chunk parsing
 and multiple audio formats (16/24/32-bit PCM, 32/64-bit float).
+Files whose payload does not fit the 32-bit RIFF size fields are
+read and written as RF64 (EBU Tech 3306).
 """
 
 import numpy as np
 import struct
 import os
+from collections import namedtuple
 
+# Largest value a 32-bit RIFF size field can hold; beyond it RF64 is used
+_MAX_RIFF_SIZE = 0xFFFFFFFF
 
-def _find_chunk(f, chunk_id):
+# Size of the ds64 chunk body written by this module (no table entries)
+_DS64_SIZE = 28
+
+
+def _find_chunk(f, chunk_id, data_size64=None):
     """
     Search for a chunk in a WAV file by its 4-byte ID.
 
     Args:
         f: File object positioned after RIFF header (at byte 12).
         chunk_id: 4-byte chunk identifier (e.g., b'fmt ', b'data').
+        data_size64 (int, optional): 64-bit data chunk size from an RF64
+            'ds64' chunk, used when the 'data' size field is 0xFFFFFFFF.
 
     Returns:
         Tuple of (chunk_size, chunk_data_position) or (None, None) if not found.
@@ -29,6 +40,9 @@ def _find_chunk(f, chunk_id):
         current_id = chunk_header[:4]
         chunk_size = struct.unpack('<I', chunk_header[4:8])[0]
 
+        if current_id == b'data' and chunk_size == _MAX_RIFF_SIZE and data_size64 is not None:
+            chunk_size = data_size64
+
         if current_id == chunk_id:
             return chunk_size, f.tell()
 
@@ -37,7 +51,244 @@ def _find_chunk(f, chunk_id):
         f.seek(skip, 1)
 
 
-def read(filename):
+def _pcm24_to_int32(raw_data):
+    """
+    Decode packed little-endian 24-bit PCM into left-justified int32.
+
+    Each 3-byte sample is copied into the top three bytes of an int32 so the
+    sign bit lands in place without a per-sample branch. The result spans the
+    full int32 range, matching scipy.io.wavfile.
+
+    Args:
+        raw_data (bytes): Packed 24-bit sample data.
+
+    Returns:
+        numpy.ndarray: 1-D int32 array of samples.
+    """
+    packed = np.frombuffer(raw_data, dtype=np.uint8)
+    n_samples = len(packed) // 3
+    widened = np.zeros((n_samples, 4), dtype=np.uint8)
+    widened[:, 1:] = packed[:n_samples * 3].reshape(-1, 3)
+    return widened.view('<i4').reshape(-1)
+
+
+def _int32_to_pcm24(data):
+    """
+    Encode left-justified int32 samples as packed little-endian 24-bit PCM.
+
+    Inverse of _pcm24_to_int32: the low byte of each sample is dropped.
+
+    Args:
+        data (numpy.ndarray): int32 samples (any shape, C-ordered on output).
+
+    Returns:
+        bytes: Packed 24-bit sample data.
+    """
+    widened = np.ascontiguousarray(data, dtype='<i4').reshape(-1, 1).view(np.uint8)
+    return widened[:, 1:].tobytes()
+
+
+def _read_header(f):
+    """
+    Parse the RIFF/WAVE header, 'fmt ' chunk and 'data' chunk header.
+
+    Leaves the file positioned at the start of the sample data.
+
+    Args:
+        f: File object opened in binary mode, positioned at byte 0.
+
+    Returns:
+        Tuple of (audio_format, channels, rate, bits_per_sample,
+        data_size, data_pos).
+    """
+    # Validate RIFF header ('RF64'/'BW64' for files over 4 GB)
+    riff = f.read(4)
+    if riff not in (b'RIFF', b'RF64', b'BW64'):
+        raise ValueError(f"Not a valid WAV file: missing RIFF header")
+
+    f.read(4)  # Skip file size
+
+    wave = f.read(4)
+    if wave != b'WAVE':
+        raise ValueError(f"Not a valid WAV file: missing WAVE format")
+
+    # RF64 stores the real 64-bit sizes in a 'ds64' chunk
+    data_size64 = None
+    if riff != b'RIFF':
+        ds64_size, ds64_pos = _find_chunk(f, b'ds64')
+        if ds64_size is None or ds64_size < 24:
+            raise ValueError("Invalid RF64 file: missing 'ds64' chunk")
+        ds64 = f.read(ds64_size)
+        data_size64 = struct.unpack('<Q', ds64[8:16])[0]
+        f.seek(12)
+
+    # Find and parse 'fmt ' chunk
+    fmt_size, fmt_pos = _find_chunk(f, b'fmt ', data_size64)
+    if fmt_size is None:
+        raise ValueError("Invalid WAV file: missing 'fmt ' chunk")
+
+    fmt_data = f.read(fmt_size)
+
+    audio_format = struct.unpack('<H', fmt_data[0:2])[0]
+    channels = struct.unpack('<H', fmt_data[2:4])[0]
+    rate = struct.unpack('<I', fmt_data[4:8])[0]
+    # bytes 8-12: byte rate (skip)
+    # bytes 12-14: block align (skip)
+    bits_per_sample = struct.unpack('<H', fmt_data[14:16])[0]
+
+    # audio_format: 1 = PCM, 3 = IEEE float, 0xFFFE = extensible
+    if audio_format == 0xFFFE and fmt_size >= 40:
+        # Extensible format - real format is in sub-format GUID
+        # Bytes 24-26 contain the actual format code
+        audio_format = struct.unpack('<H', fmt_data[24:26])[0]
+
+    # Seek back to after WAVE header to find data chunk
+    f.seek(12)
+    data_size, data_pos = _find_chunk(f, b'data', data_size64)
+    if data_size is None:
+        raise ValueError("Invalid WAV file: missing 'data' chunk")
+
+    return audio_format, channels, rate, bits_per_sample, data_size, data_pos
+
+
+def _storage_dtype(audio_format, bits_per_sample):
+    """
+    Map a WAV format code and bit depth to the numpy dtype stored on disk.
+
+    24-bit PCM has no native numpy dtype; it is reported as a 3-byte
+    void type ('V3') and must be decoded with _pcm24_to_int32.
+    """
+    if audio_format == 1:  # PCM
+        if bits_per_sample == 8:
+            return np.dtype(np.uint8)
+        elif bits_per_sample == 16:
+            return np.dtype('<i2')
+        elif bits_per_sample == 24:
+            return np.dtype('V3')
+        elif bits_per_sample == 32:
+            return np.dtype('<i4')
+        raise ValueError(f"Unsupported PCM bit depth: {bits_per_sample}")
+
+    elif audio_format == 3:  # IEEE float
+        if bits_per_sample == 32:
+            return np.dtype('<f4')
+        elif bits_per_sample == 64:
+            return np.dtype('<f8')
+        raise ValueError(f"Unsupported float bit depth: {bits_per_sample}")
+
+    raise ValueError(f"Unsupported audio format: {audio_format}")
+
+
+def _map_frames(filename):
+    """
+    Memory-map the data chunk of a WAV file without reading it.
+
+    Args:
+        filename (str): Path to the WAV file.
+
+    Returns:
+        rate (int): Sample rate of the file.
+        frames (numpy.memmap): Read-only view of shape (frames, channels).
+            24-bit PCM is mapped as raw uint8 of shape (frames, channels * 3).
+        bits_per_sample (int): Bit depth of the stored samples.
+    """
+    meta = info(filename)
+
+    if meta.bits_per_sample == 24:
+        dtype = np.dtype(np.uint8)
+        row = meta.channels * 3
+    else:
+        dtype = meta.dtype
+        row = meta.channels
+
+    if meta.frames == 0:
+        return meta.rate, np.zeros((0, row), dtype=dtype), meta.bits_per_sample
+
+    frames = np.memmap(filename, dtype=dtype, mode='r', offset=meta.data_offset,
+                       shape=(meta.frames, row))
+    return meta.rate, frames, meta.bits_per_sample
+
+
+def _to_float32(data):
+    """
+    Convert raw sample data to float32 normalized to [-1, 1].
+
+    Args:
+        data (numpy.ndarray): Array as returned by read().
+
+    Returns:
+        numpy.ndarray: float32 array of the same shape.
+    """
+    if data.dtype == np.int16:
+        return data.astype(np.float32) / 32768.0
+    elif data.dtype == np.int32:
+        return data.astype(np.float32) / 2147483648.0
+    elif data.dtype == np.float32:
+        return np.asarray(data)
+    elif data.dtype == np.float64:
+        return data.astype(np.float32)
+    elif data.dtype == np.uint8:
+        return (data.astype(np.float32) - 128) / 128.0
+
+    # Fallback for other dtypes
+    audio = data.astype(np.float32)
+    max_val = np.max(np.abs(audio)) if audio.size else 0
+    if max_val > 0:
+        audio = audio / max_val
+    return audio
+
+
+class WavInfo(namedtuple('WavInfo', ['rate', 'channels', 'dtype', 'frames',
+                                     'bits_per_sample', 'data_offset'])):
+    """
+    Header metadata returned by info().
+
+    Fields:
+        rate (int): Sample rate.
+        channels (int): Number of channels.
+        dtype (numpy.dtype): dtype read() returns (int32 for 24-bit PCM).
+        frames (int): Number of complete frames in the data chunk.
+        bits_per_sample (int): Bit depth as stored on disk.
+        data_offset (int): Byte offset of the first sample in the file.
+    """
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        """Length in seconds."""
+        return self.frames / self.rate if self.rate else 0.0
+
+
+def info(filename):
+    """
+    Read WAV metadata from the headers only, without touching sample data.
+
+    Args:
+        filename (str): Path to the WAV file.
+
+    Returns:
+        WavInfo: rate, channels, dtype, frames, bits_per_sample and
+        data_offset. WavInfo.duration gives the length in seconds.
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"File not found: {filename}")
+
+    with open(filename, 'rb') as f:
+        audio_format, channels, rate, bits_per_sample, data_size, data_pos = _read_header(f)
+
+    dtype = _storage_dtype(audio_format, bits_per_sample)
+    if bits_per_sample == 24:
+        dtype = np.dtype(np.int32)
+    frame_bytes = channels * (bits_per_sample // 8)
+
+    # Clamp to what is actually on disk (truncated or still-growing files)
+    available = max(os.path.getsize(filename) - data_pos, 0)
+    frames = min(data_size, available) // frame_bytes if frame_bytes else 0
+
+    return WavInfo(rate, channels, dtype, frames, bits_per_sample, data_pos)
+
+
+def read(filename, mmap=False, start=0, stop=None):
     """
     Drop-in replacement for scipy.io.wavfile.read.
 
@@ -47,94 +298,59 @@ def read(filename):
     Supports:
         - 8-bit unsigned PCM (uint8)
         - 16-bit signed PCM (int16)
-        - 24-bit signed PCM (int32, scaled)
+        - 24-bit signed PCM (int32, left-justified to full int32 range)
         - 32-bit signed PCM (int32)
         - 32-bit IEEE float (float32)
         - 64-bit IEEE float (float64)
 
     Args:
         filename (str): Path to the WAV file.
+        mmap (bool): If True, return a read-only np.memmap over the data
+            chunk instead of reading it into memory. Not available for
+            24-bit PCM, which has no native numpy dtype (as in scipy);
+            use audio_io.load_audio(..., mmap=True) for lazy 24-bit access.
+        start (int): First frame to read (default 0). Negative values count
+            from the end, as in slicing.
+        stop (int, optional): Frame to stop before (default: end of file).
+            Only the requested span is read from disk.
 
     Returns:
         rate (int): Sample rate of the file.
         data (numpy.ndarray): Audio data as numpy array.
                               Shape is (N,) for mono or (N, channels) for multi-channel.
     """
+    if mmap:
+        rate, frames, bits_per_sample = _map_frames(filename)
+        if bits_per_sample == 24:
+            raise ValueError("mmap=True is not compatible with 24-bit PCM")
+        frames = frames[start:stop]
+        if frames.shape[1] == 1:
+            frames = frames[:, 0]
+        return rate, frames
+
     if not os.path.exists(filename):
         raise FileNotFoundError(f"File not found: {filename}")
 
     with open(filename, 'rb') as f:
-        # Validate RIFF header
-        riff = f.read(4)
-        if riff != b'RIFF':
-            raise ValueError(f"Not a valid WAV file: missing RIFF header")
-
-        f.read(4)  # Skip file size
-
-        wave = f.read(4)
-        if wave != b'WAVE':
-            raise ValueError(f"Not a valid WAV file: missing WAVE format")
-
-        # Find and parse 'fmt ' chunk
-        fmt_size, fmt_pos = _find_chunk(f, b'fmt ')
-        if fmt_size is None:
-            raise ValueError("Invalid WAV file: missing 'fmt ' chunk")
-
-        fmt_data = f.read(fmt_size)
-
-        audio_format = struct.unpack('<H', fmt_data[0:2])[0]
-        channels = struct.unpack('<H', fmt_data[2:4])[0]
-        rate = struct.unpack('<I', fmt_data[4:8])[0]
-        # bytes 8-12: byte rate (skip)
-        # bytes 12-14: block align (skip)
-        bits_per_sample = struct.unpack('<H', fmt_data[14:16])[0]
-
-        # audio_format: 1 = PCM, 3 = IEEE float, 0xFFFE = extensible
-        if audio_format == 0xFFFE and fmt_size >= 40:
-            # Extensible format - real format is in sub-format GUID
-            # Bytes 24-26 contain the actual format code
-            audio_format = struct.unpack('<H', fmt_data[24:26])[0]
-
-        # Seek back to after WAVE header to find data chunk
-        f.seek(12)
-        data_size, data_pos = _find_chunk(f, b'data')
-        if data_size is None:
-            raise ValueError("Invalid WAV file: missing 'data' chunk")
+        audio_format, channels, rate, bits_per_sample, data_size, data_pos = _read_header(f)
+
+        # Seek straight to the requested frame span
+        frame_bytes = channels * (bits_per_sample // 8)
+        if start != 0 or stop is not None:
+            num_frames = data_size // frame_bytes if frame_bytes else 0
+            first, last, _ = slice(start, stop).indices(num_frames)
+            f.seek(data_pos + first * frame_bytes)
+            data_size = max(last - first, 0) * frame_bytes
 
         # Read audio data
         raw_data = f.read(data_size)
 
     # Convert to numpy array based on format
-    if audio_format == 1:  # PCM
-        if bits_per_sample == 8:
-            data = np.frombuffer(raw_data, dtype=np.uint8)
-        elif bits_per_sample == 16:
-            data = np.frombuffer(raw_data, dtype=np.int16)
-        elif bits_per_sample == 24:
-            # 24-bit needs special handling - pack into int32
-            n_samples = len(raw_data) // 3
-            data = np.zeros(n_samples, dtype=np.int32)
-            for i in range(n_samples):
-                # Little-endian 24-bit to int32 with sign extension
-                b = raw_data[i*3:(i+1)*3]
-                val = b[0] | (b[1] << 8) | (b[2] << 16)
-                if val >= 0x800000:  # Sign extend
-                    val -= 0x1000000
-                data[i] = val
-        elif bits_per_sample == 32:
-            data = np.frombuffer(raw_data, dtype=np.int32)
-        else:
-            raise ValueError(f"Unsupported PCM bit depth: {bits_per_sample}")
-
-    elif audio_format == 3:  # IEEE float
-        if bits_per_sample == 32:
-            data = np.frombuffer(raw_data, dtype=np.float32)
-        elif bits_per_sample == 64:
-            data = np.frombuffer(raw_data, dtype=np.float64)
-        else:
-            raise ValueError(f"Unsupported float bit depth: {bits_per_sample}")
+    dtype = _storage_dtype(audio_format, bits_per_sample)
+    if bits_per_sample == 24:
+        data = _pcm24_to_int32(raw_data)
     else:
-        raise ValueError(f"Unsupported audio format: {audio_format}")
+        data = np.frombuffer(raw_data, dtype=dtype, count=len(raw_data) // dtype.itemsize)
 
     # Reshape for multi-channel
     if channels > 1:
@@ -144,13 +360,114 @@ def read(filename):
     return rate, data
 
 
-def write(filename, rate, data):
+def _output_format(dtype, bit_depth=None):
+    """
+    Choose the WAV sample format for a numpy dtype.
+
+    Args:
+        dtype (numpy.dtype): dtype of the data to be written.
+        bit_depth (int, optional): 24 to force packed 24-bit PCM for int32.
+
+    Returns:
+        Tuple of (audio_format, bits_per_sample, out_dtype), where out_dtype
+        is the dtype the data must be cast to before encoding.
+    """
+    dtype = np.dtype(dtype)
+
+    if bit_depth not in (None, 24):
+        raise ValueError(f"Unsupported bit_depth: {bit_depth} (only 24 may be forced)")
+    if bit_depth == 24 and dtype != np.int32:
+        raise ValueError(f"bit_depth=24 requires int32 data, got {dtype}")
+
+    if dtype == np.int16:
+        return 1, 16, np.dtype('<i2')              # PCM
+    elif dtype == np.int32:
+        return 1, bit_depth or 32, np.dtype('<i4')  # PCM
+    elif dtype == np.float32:
+        return 3, 32, np.dtype('<f4')              # IEEE float
+    elif dtype == np.float64:
+        return 3, 64, np.dtype('<f8')              # IEEE float
+    elif dtype == np.uint8:
+        return 1, 8, np.dtype(np.uint8)            # PCM
+    elif dtype.kind == 'f':
+        # Other float types -> float32
+        return 3, 32, np.dtype('<f4')
+    elif dtype.kind in ('i', 'u'):
+        # Other int types -> int16
+        return 1, 16, np.dtype('<i2')
+    raise ValueError(f"Unsupported dtype: {dtype}")
+
+
+def _encode(data, out_dtype, bits_per_sample):
+    """Return the little-endian sample bytes for data as a buffer."""
+    out_data = np.ascontiguousarray(data, dtype=out_dtype)
+    if bits_per_sample == 24:
+        return _int32_to_pcm24(out_data)
+    return out_data.reshape(-1).view(np.uint8)
+
+
+def _build_header(audio_format, channels, rate, bits_per_sample, data_size, reserve_ds64=False):
+    """
+    Build a WAV header.
+
+    A canonical 44-byte RIFF header is produced when the sizes fit in 32
+    bits. Otherwise an RF64 header with a 'ds64' chunk holding the 64-bit
+    sizes is produced. With reserve_ds64=True the RIFF header carries a
+    'JUNK' chunk of the same size as 'ds64', so a streamed file can be
+    upgraded to RF64 in place once its final size is known.
+
+    Args:
+        audio_format (int): 1 for PCM, 3 for IEEE float.
+        channels (int): Number of channels.
+        rate (int): Sample rate.
+        bits_per_sample (int): Bits per sample.
+        data_size (int): Size of the data chunk in bytes.
+        reserve_ds64 (bool): Always include a ds64-sized chunk (default False).
+
+    Returns:
+        bytes: The header.
+    """
+    bytes_per_sample = bits_per_sample // 8
+    block_align = channels * bytes_per_sample
+    byte_rate = rate * block_align
+
+    fmt = struct.pack(
+        '<4sIHHIIHH',
+        b'fmt ', 16,                           # fmt chunk size
+        audio_format,                          # Audio format (1=PCM, 3=float)
+        channels,                              # Number of channels
+        rate,                                  # Sample rate
+        byte_rate,                             # Byte rate
+        block_align,                           # Block align
+        bits_per_sample,                       # Bits per sample
+    )
+
+    # Everything after the RIFF size field: 'WAVE', chunks, data and pad byte
+    riff_size = 4 + len(fmt) + 8 + data_size + (data_size % 2)
+    if reserve_ds64:
+        riff_size += 8 + _DS64_SIZE
+
+    if riff_size > _MAX_RIFF_SIZE or data_size > _MAX_RIFF_SIZE:
+        if not reserve_ds64:
+            riff_size += 8 + _DS64_SIZE
+        sample_count = data_size // block_align if block_align else 0
+        ds64 = struct.pack('<4sIQQQI', b'ds64', _DS64_SIZE,
+                           riff_size, data_size, sample_count, 0)
+        return (struct.pack('<4sI4s', b'RF64', _MAX_RIFF_SIZE, b'WAVE') + ds64 + fmt
+                + struct.pack('<4sI', b'data', _MAX_RIFF_SIZE))
+
+    junk = struct.pack('<4sI', b'JUNK', _DS64_SIZE) + bytes(_DS64_SIZE) if reserve_ds64 else b''
+    return (struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE') + junk + fmt
+            + struct.pack('<4sI', b'data', data_size))
+
+
+def write(filename, rate, data, bit_depth=None):
     """
     Drop-in replacement for scipy.io.wavfile.write.
 
     Automatically determines output format based on input dtype:
         - int16 input  -> 16-bit PCM output
-        - int32 input  -> 32-bit PCM output
+        - int32 input  -> 32-bit PCM output (24-bit packed PCM if bit_depth=24)
         - float32 input -> 32-bit float output
         - float64 input -> 64-bit float output
         - Other int types -> 16-bit PCM (with conversion)
@@ -162,42 +479,14 @@ def write(filename, rate, data):
         filename (str): Path to output file.
         rate (int): Sample rate (e.g., 44100).
         data (numpy.ndarray): Audio data. Shape (N,) for mono or (N, channels) for multi-channel.
+        bit_depth (int, optional): Set to 24 to write int32 data as packed
+            24-bit PCM. The low byte of each left-justified int32 sample is
+            dropped, so read() and write() round-trip 24-bit files exactly.
     """
     data = np.asarray(data)
 
     # Determine format based on dtype
-    if data.dtype == np.int16:
-        audio_format = 1  # PCM
-        bits_per_sample = 16
-        out_data = data
-    elif data.dtype == np.int32:
-        audio_format = 1  # PCM
-        bits_per_sample = 32
-        out_data = data
-    elif data.dtype == np.float32:
-        audio_format = 3  # IEEE float
-        bits_per_sample = 32
-        out_data = data
-    elif data.dtype == np.float64:
-        audio_format = 3  # IEEE float
-        bits_per_sample = 64
-        out_data = data
-    elif data.dtype == np.uint8:
-        audio_format = 1  # PCM
-        bits_per_sample = 8
-        out_data = data
-    elif data.dtype.kind == 'f':
-        # Other float types -> float32
-        audio_format = 3
-        bits_per_sample = 32
-        out_data = data.astype(np.float32)
-    elif data.dtype.kind in ('i', 'u'):
-        # Other int types -> int16
-        audio_format = 1
-        bits_per_sample = 16
-        out_data = data.astype(np.int16)
-    else:
-        raise ValueError(f"Unsupported dtype: {data.dtype}")
+    audio_format, bits_per_sample, out_dtype = _output_format(data.dtype, bit_depth)
 
     # Handle channels
     if data.ndim == 1:
@@ -205,27 +494,156 @@ def write(filename, rate, data):
     else:
         channels = data.shape[1]
 
-    # Calculate header values
-    bytes_per_sample = bits_per_sample // 8
-    byte_rate = rate * channels * bytes_per_sample
-    block_align = channels * bytes_per_sample
-    data_bytes = out_data.tobytes()
-
-    # Build WAV header
-    header = b'RIFF'
-    header += struct.pack('<I', 36 + len(data_bytes))  # File size - 8
-    header += b'WAVE'
-    header += b'fmt '
-    header += struct.pack('<I', 16)                    # fmt chunk size
-    header += struct.pack('<H', audio_format)          # Audio format (1=PCM, 3=float)
-    header += struct.pack('<H', channels)              # Number of channels
-    header += struct.pack('<I', rate)                  # Sample rate
-    header += struct.pack('<I', byte_rate)             # Byte rate
-    header += struct.pack('<H', block_align)           # Block align
-    header += struct.pack('<H', bits_per_sample)       # Bits per sample
-    header += b'data'
-    header += struct.pack('<I', len(data_bytes))       # Data chunk size
+    data_bytes = _encode(data, out_dtype, bits_per_sample)
+    header = _build_header(audio_format, channels, rate, bits_per_sample, len(data_bytes))
 
     with open(filename, 'wb') as f:
         f.write(header)
         f.write(data_bytes)
+        if len(data_bytes) % 2:
+            f.write(b'\x00')  # Pad byte; not counted in the chunk size
+
+
+def iter_blocks(filename, block_size, overlap=0):
+    """
+    Read a WAV file block by block as float32.
+
+    Only one block (plus the overlap carried from the previous one) is held
+    in memory at a time, so arbitrarily long files can be processed in
+    constant memory.
+
+    Args:
+        filename (str): Path to the WAV file.
+        block_size (int): Frames per yielded block.
+        overlap (int): Frames shared between consecutive blocks (default 0).
+            Each block starts block_size - overlap frames after the last.
+
+    Yields:
+        numpy.ndarray: float32 block normalized to [-1, 1], shape
+        (frames,) for mono or (frames, channels). The final block may be
+        shorter than block_size.
+    """
+    block_size = int(block_size)
+    overlap = int(overlap)
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+    if not 0 <= overlap < block_size:
+        raise ValueError("overlap must satisfy 0 <= overlap < block_size")
+
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"File not found: {filename}")
+
+    with open(filename, 'rb') as f:
+        audio_format, channels, rate, bits_per_sample, data_size, data_pos = _read_header(f)
+        dtype = _storage_dtype(audio_format, bits_per_sample)
+        frame_bytes = channels * (bits_per_sample // 8)
+        remaining = data_size - data_size % frame_bytes
+
+        hop = block_size - overlap
+        to_read = block_size
+        tail = None
+
+        while remaining > 0:
+            raw = f.read(min(to_read * frame_bytes, remaining))
+            raw = raw[:len(raw) - len(raw) % frame_bytes]
+            if not raw:
+                break
+            remaining -= len(raw)
+
+            if bits_per_sample == 24:
+                samples = _pcm24_to_int32(raw)
+            else:
+                samples = np.frombuffer(raw, dtype=dtype)
+            new = _to_float32(samples).reshape(-1, channels)
+
+            block = new if tail is None else np.concatenate([tail, new])
+            tail = block[len(block) - overlap:] if overlap else None
+            yield block[:, 0] if channels == 1 else block
+
+            if len(new) < to_read:
+                break
+            to_read = hop
+
+
+class WavWriter:
+    """
+    Incremental WAV writer.
+
+    Blocks are appended as they are produced and the RIFF/data chunk sizes
+    are patched when the writer is closed, so the full signal never has to
+    be held in memory. The output format is chosen from the first block's
+    dtype using the same rules as write(); later blocks are cast to it.
+
+    The header reserves room for an RF64 'ds64' chunk, so outputs that grow
+    past 4 GB are converted to RF64 on close.
+
+    Example:
+        with WavWriter("out.wav", 44100) as w:
+            for block in iter_blocks("in.wav", 4096):
+                w.write(block * 0.5)
+    """
+
+    def __init__(self, filename, rate, bit_depth=None):
+        self.filename = filename
+        self.rate = int(rate)
+        self.bit_depth = bit_depth
+        self.channels = None
+        self.frames_written = 0
+        self._format = None
+        self._data_size = 0
+        self._f = open(filename, 'wb')
+
+    def write(self, block):
+        """
+        Append a block of samples.
+
+        Args:
+            block (numpy.ndarray): Shape (N,) or (N, channels). The channel
+                count must match the first block written.
+        """
+        if self._f is None:
+            raise ValueError("write to closed WavWriter")
+
+        block = np.asarray(block)
+        channels = 1 if block.ndim == 1 else block.shape[1]
+
+        if self._format is None:
+            self._format = _output_format(block.dtype, self.bit_depth)
+            self.channels = channels
+            audio_format, bits_per_sample, _ = self._format
+            self._f.write(_build_header(audio_format, channels, self.rate, bits_per_sample, 0,
+                                        reserve_ds64=True))
+        elif channels != self.channels:
+            raise ValueError(f"Expected {self.channels} channels, got {channels}")
+
+        _, bits_per_sample, out_dtype = self._format
+        data_bytes = _encode(block, out_dtype, bits_per_sample)
+        self._f.write(data_bytes)
+        self._data_size += len(data_bytes)
+        self.frames_written += len(block)
+
+    def close(self):
+        """Patch the header sizes and close the file."""
+        if self._f is None:
+            return
+        try:
+            if self._format is None:
+                # Nothing written: emit a valid empty float32 mono file
+                self._format = _output_format(np.float32)
+                self.channels = 1
+            audio_format, bits_per_sample, _ = self._format
+            if self._data_size % 2:
+                self._f.write(b'\x00')  # Pad byte; not counted in the chunk size
+            self._f.seek(0)
+            self._f.write(_build_header(audio_format, self.channels, self.rate,
+                                        bits_per_sample, self._data_size, reserve_ds64=True))
+        finally:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,24 @@
+import os
+import tempfile
+import numpy as np
+from audio_dsp.utils import wav_io, load_files, AudioCache
+
+# Many threads sharing one small cache: entries are evicted while other
+# workers are still writing and mapping theirs
+tmp = tempfile.mkdtemp()
+paths = []
+rng = np.random.default_rng(0)
+for i in range(200):
+    path = os.path.join(tmp, f"s{i}.wav")
+    wav_io.write(path, 22050, (rng.standard_normal(2000) * 8000).astype(np.int16))
+    paths.append(path)
+
+for run in range(5):
+    cache = AudioCache(os.path.join(tmp, f"cache{run}"), max_bytes=200000)
+    for attempt in range(2):
+        loaded = load_files(paths, sr=44100, workers=16, cache=cache)
+        assert len(loaded) == len(paths)
+        assert all(len(audio) == 4000 for audio in loaded.values())
+    stats = cache.stats()
+    assert stats["bytes"] <= 200000 and stats["evictions"] > 0
+    print(f"run {run}: {stats}")
@@ -0,0 +1,55 @@
+import numpy as np
+from audio_dsp.dynamics import LevelDetector, EnvelopeFollower, Compressor, gain_computer
+
+sr = 44100
+rng = np.random.default_rng(0)
+signal = rng.standard_normal(sr) * np.repeat(rng.uniform(0.01, 1.0, 20), sr // 20)
+sizes = [1, 7, 64, 1000, 4410, 30000]
+
+
+def in_blocks(process):
+    """Feed signal through process() in uneven blocks."""
+    out, start, i = [], 0, 0
+    while start < len(signal):
+        stop = start + sizes[i % len(sizes)]
+        out.append(process(signal[start:stop]))
+        start, i = stop, i + 1
+    return np.concatenate(out)
+
+
+# Streaming block by block must match one call on the whole signal
+for mode in ("peak", "rms", "true_peak"):
+    whole = LevelDetector(mode, window=441).process(signal)
+    streamed = in_blocks(LevelDetector(mode, window=441).process)
+    assert np.allclose(whole, streamed, atol=1e-12), mode
+    print(f"LevelDetector {mode}: max diff {np.max(np.abs(whole - streamed)):.2e}")
+
+for attack_on_rise, initial in ((True, 0.0), (False, 1.0), (True, None)):
+    whole = EnvelopeFollower(sr, 0.005, 0.1, attack_on_rise, initial).process(np.abs(signal))
+    follower = EnvelopeFollower(sr, 0.005, 0.1, attack_on_rise, initial)
+    streamed = in_blocks(lambda block: follower.process(np.abs(block)))
+    assert np.allclose(whole, streamed, atol=1e-12)
+    print(f"EnvelopeFollower attack_on_rise={attack_on_rise}: max diff {np.max(np.abs(whole - streamed)):.2e}")
+
+for detector in ("peak", "rms", "true_peak"):
+    settings = dict(threshold=-18, ratio=4, attack=0.005, release=0.1, knee_width=6, makeup="auto",
+                    detector=detector)
+    whole = Compressor(sr, **settings).process(signal)
+    streamed = in_blocks(Compressor(sr, **settings).process)
+    assert np.allclose(whole, streamed, atol=1e-12), detector
+    print(f"Compressor {detector}: max diff {np.max(np.abs(whole - streamed)):.2e}")
+
+# Soft knee: untouched below, linear above, quadratic and continuous in between
+threshold, ratio, knee = -20.0, 4.0, 10.0
+slope = 1 / ratio - 1
+assert gain_computer(threshold - knee / 2 - 0.1, threshold, ratio, knee) == 0
+assert np.isclose(gain_computer(threshold + 8, threshold, ratio, knee), slope * 8)
+assert np.isclose(gain_computer(threshold, threshold, ratio, knee), slope * knee / 8)
+levels = np.linspace(threshold - 20, threshold + 20, 40001)
+curve = gain_computer(levels, threshold, ratio, knee)
+assert np.max(np.abs(np.diff(curve))) < 1e-3  # No jumps
+assert np.max(np.abs(np.diff(curve, 2))) < 1e-6  # No kinks
+assert np.all(np.diff(curve) <= 1e-12)  # Reduction never shrinks as the level rises
+hard = gain_computer(levels, threshold, ratio)
+assert np.allclose(hard, np.minimum(slope * (levels - threshold), 0))
+print("gain_computer knee OK")
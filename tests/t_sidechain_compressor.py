@@ -0,0 +1,32 @@
+import numpy as np
+from audio_dsp.effects.negative_audio import SidechainCompressor
+
+sr = 44100
+rng = np.random.default_rng(0)
+main = rng.standard_normal(sr) * 0.5
+key = np.repeat(rng.uniform(0, 0.2, 20), sr // 20) * np.sin(np.arange(sr) * 0.01)
+
+# Empty blocks (end of file, short reads) pass through without touching the state
+duck = SidechainCompressor(sr)
+assert duck.process_block(main[:0], key[:0]).shape == (0,)
+assert duck.process_block(main[:1000], key[:0]).shape == (1000,)
+duck.reset()
+assert duck.process_block(main[:0], key[:0]).shape == (0,)
+first = duck.process_block(main[:1000], key[:1000])
+duck.reset()
+assert np.allclose(first, duck.process_block(main[:1000], key[:1000]))
+
+# Streaming matches one call: any block size without decimation, multiples of D with it
+for decimation, sizes in ((1, [1, 7, 0, 513, 4096]), (4, [4, 0, 64, 1024, 12])):
+    whole = SidechainCompressor(sr, key_decimation=decimation)
+    reference = whole.process_block(main, key[::decimation])
+    duck = SidechainCompressor(sr, key_decimation=decimation)
+    out, start, i = [], 0, 0
+    while start < len(main):
+        stop = min(start + sizes[i % len(sizes)], len(main))
+        out.append(duck.process_block(main[start:stop], key[start:stop:decimation]))
+        start, i = stop, i + 1
+    out.append(duck.process_block(main[:0], key[:0]))
+    streamed = np.concatenate(out)
+    assert np.allclose(reference, streamed, atol=1e-12), decimation
+    print(f"key_decimation={decimation}: max diff {np.max(np.abs(reference - streamed)):.2e}")